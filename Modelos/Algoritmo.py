@@ -13,6 +13,8 @@ class Algoritmo:
     Representa un algoritmo a ser analizado.
     Mapea la clase 'Algoritmo' del diagrama UML.
     """
+    __slots__ = ('_id', '_codigo_fuente', '_tipo_algoritmo', '_arbol_sintactico', '_reporte', '_analizador', '_usuario')
+
     def __init__(self, id: int, codigo_fuente: str, tipo_algoritmo: TipoAlgoritmo):
         self._id = id
         self._codigo_fuente = codigo_fuente
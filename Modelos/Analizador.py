@@ -1,23 +1,168 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Tuple
 import ast  # Importamos el módulo ast para trabajar con los nodos
+import hashlib
+import multiprocessing
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 # Importamos la clase separada que hace el trabajo pesado
-from .Algoritmo import Algoritmo
 from .Complejidad import Complejidad
-from Servicios.EfficiencyVisitor import EfficiencyVisitor
 try:
     import sympy
 except ImportError:
     sympy = None
 
+# Símbolo del tamaño de la entrada, creado una sola vez.
+_N = sympy.Symbol('n') if sympy else None
 
+
+# Importaciones usadas solo en anotaciones; no se evalúan en tiempo de ejecución
 if TYPE_CHECKING:
+    from .Algoritmo import Algoritmo
     from .Reporte import Reporte
     from .Parser import Parser
     from Servicios.LLMService import LLMService
     from .Usuario import Usuario
     from Servicios.Ast import AST
+    from Enumerations.tipoAlgoritmo import TipoAlgoritmo
+
+
+# Clasificación de los nodos relevantes para el análisis estructural. Los nodos
+# de 'ast' son clases concretas, así que basta con buscar type(nodo) en un dict
+# en lugar de encadenar comprobaciones isinstance.
+_BUCLE, _SALIDA, _FUNCION, _LLAMADA = range(4)
+_TIPOS_NODO = {
+    ast.For: _BUCLE,
+    ast.While: _BUCLE,
+    ast.Break: _SALIDA,
+    ast.Return: _SALIDA,
+    ast.FunctionDef: _FUNCION,
+    ast.Call: _LLAMADA,
+}
+
+
+
+def _grado(expr: sympy.Expr) -> int | None:
+    """
+    Grado en n de una función de coste de EfficiencyVisitor, o None si su forma
+    no es la esperada. De un Max (peor rama de un if) cuenta el argumento de
+    mayor grado y de un Min (mejor rama) el de menor grado.
+    """
+    if expr.is_polynomial(_N):
+        return int(sympy.degree(expr, _N)) if expr != 0 else 0
+    if isinstance(expr, (sympy.Max, sympy.Min)) or expr.is_Add or expr.is_Mul:
+        grados = [_grado(arg) for arg in expr.args]
+        if None in grados:
+            return None
+        if expr.is_Mul:
+            return sum(grados)
+        return min(grados) if isinstance(expr, sympy.Min) else max(grados)
+    return None
+
+
+def _termino_dominante(expr: sympy.Expr) -> sympy.Expr:
+    """
+    Devuelve el término dominante de T(n) cuando n → ∞ (sin coeficiente).
+    Las funciones que construye EfficiencyVisitor para bucles son polinomios
+    en n, o sumas y productos de ellos con Max/Min, cuyo término dominante es
+    n^grado; solo las demás expresiones pasan por la maquinaria asintótica
+    general de sympy.O.
+    """
+    grado = _grado(expr)
+    if grado is not None:
+        return _N ** grado if grado else sympy.Integer(1)
+    return sympy.O(expr, (_N, sympy.oo)).args[0]
+
+
+def _grado_mejor_caso(sentencias: List[ast.AST]) -> Tuple[int, bool, bool]:
+    """
+    Grado en n del mejor caso de un bloque de sentencias, con las mismas reglas
+    que EfficiencyVisitor: un for sin salida temprana ejecuta su cuerpo n veces;
+    un for con un break propio o un return, y cualquier while, lo ejecutan un
+    número constante de veces; de un if cuenta la rama más barata. Devuelve
+    también si el bloque contiene un break o un return que lo abandonan.
+    """
+    grado, hay_break, hay_return = 0, False, False
+    for sentencia in sentencias:
+        tipo = type(sentencia)
+        if tipo is ast.For or tipo is ast.While:
+            g, b, r = _grado_mejor_caso(sentencia.body)
+            if tipo is ast.For and not (b or r):
+                g += 1
+            # El break solo abandona este bucle; el return, también los exteriores.
+            hay_return = hay_return or r
+        elif tipo is ast.If:
+            g_if, b_if, r_if = _grado_mejor_caso(sentencia.body)
+            g_else, b_else, r_else = _grado_mejor_caso(sentencia.orelse)
+            g = min(g_if, g_else)
+            hay_break = hay_break or b_if or b_else
+            hay_return = hay_return or r_if or r_else
+        elif tipo is ast.Break:
+            g, hay_break = 0, True
+        elif tipo is ast.Return:
+            g, hay_return = 0, True
+        else:
+            # Otras sentencias compuestas (def, with, try, ...): sus bloques se suman.
+            g, b, r = _grado_mejor_caso([hijo for hijo in ast.iter_child_nodes(sentencia)
+                                         if isinstance(hijo, (ast.stmt, ast.excepthandler))])
+            hay_break = hay_break or b
+            hay_return = hay_return or r
+        grado = max(grado, g)
+    return grado, hay_break, hay_return
+
+
+def _termino_polinomico(profundidad: int) -> str:
+    """
+    Término dominante de T(n) para una profundidad de bucles, escrito como lo
+    imprime sympy ('1', 'n', 'n**2', ...) para que coincida con el análisis simbólico.
+    """
+    if profundidad == 0:
+        return "1"
+    elif profundidad == 1:
+        return "n"
+    return f"n**{profundidad}"
+
+
+def _notaciones_asintoticas(orden_peor: object, orden_mejor: object) -> Tuple[str, str, str]:
+    """
+    Construye las notaciones (O, Ω, Θ) a partir de los términos dominantes del
+    peor y mejor caso. La usan tanto la ruta estructural como la simbólica de
+    Analizador.analizar, de modo que ambas producen exactamente las mismas cadenas.
+    """
+    orden_peor, orden_mejor = str(orden_peor), str(orden_mejor)
+    notacion_theta = f"Θ({orden_peor})" if orden_peor == orden_mejor else "No aplicable"
+    return f"O({orden_peor})", f"Ω({orden_mejor})", notacion_theta
+
+
+def _construir_notaciones(max_profundidad: int) -> Dict[Tuple[int, int], Tuple[str, str, str]]:
+    """
+    Precalcula las notaciones (O, Ω, Θ) para cada combinación de grado del peor
+    caso (profundidad de bucles) y del mejor caso. Tras el recorrido del AST
+    basta con indexar la tabla, sin ramificaciones ni formateo de cadenas.
+    """
+    tabla = {}
+    for profundidad in range(max_profundidad + 1):
+        for mejor in range(profundidad + 1):
+            notaciones = _notaciones_asintoticas(_termino_polinomico(profundidad), _termino_polinomico(mejor))
+            tabla[(profundidad, mejor)] = tuple(sys.intern(n) for n in notaciones)
+    return tabla
+
+
+def _analizar_en_proceso(id: int, codigo_fuente: str, tipo_algoritmo: TipoAlgoritmo, codigo_python: str) -> Complejidad:
+    """
+    Tarea ejecutada en un proceso trabajador de Analizador.analizar_lote.
+    Solo recibe cadenas: el AST se reconstruye dentro del proceso, lo que es más
+    barato que serializar el árbol, y cada proceso usa su propio Analizador.
+    """
+    from .Algoritmo import Algoritmo
+    from Servicios.Ast import AST
+
+    algoritmo = Algoritmo(id=id, codigo_fuente=codigo_fuente, tipo_algoritmo=tipo_algoritmo)
+    algoritmo.addAST(AST(codigo_python))
+    return Analizador(id=id, parser=None, llm_service=None).analizar(algoritmo)
 
 
 class Analizador:
@@ -26,6 +171,20 @@ class Analizador:
     Mapea la clase 'Analizador' del diagrama UML y ahora contiene la lógica
     de análisis algorítmico.
     """
+    __slots__ = ('_id', '_parser', '_llm_service', '_algoritmos', '_reporte', '_complejidad', '_usuario',
+                 '_ultimo_analisis', '_sym_cache')
+
+    # Número máximo de resultados simbólicos que se conservan en memoria.
+    _SYM_CACHE_MAXSIZE = 128
+    # Profundidad máxima de bucles anidados que se analiza; los anidamientos
+    # más profundos son raros y se acotan para limitar el coste del análisis.
+    MAX_LOOP_DEPTH = 16
+    # (grado del peor caso, grado del mejor caso) -> (O, Ω, Θ), construida una sola vez.
+    _NOTACIONES = _construir_notaciones(MAX_LOOP_DEPTH)
+    # Número mínimo de algoritmos de la ruta simbólica para analizarlos en un pool.
+    # Arrancar el pool con 'spawn' cuesta unos 0,4 s y cada análisis simbólico de
+    # 4 a 11 ms, así que con 2 CPU no compensa hasta rondar los 100 algoritmos.
+    _MIN_LOTE_PARALELO = 128
 
     def __init__(self, id:int, parser: Parser, llm_service: LLMService):
         self._id = id
@@ -37,6 +196,8 @@ class Analizador:
         self._usuario: Usuario | None = None
         # Atributos para guardar los resultados del último análisis
         self._ultimo_analisis: Dict[str, Any] = {}
+        # Caché LRU de resultados simbólicos, indexada por la estructura del AST
+        self._sym_cache: OrderedDict[bytes, Dict[str, Any]] = OrderedDict()
 
     # --- Propiedades existentes (sin cambios) ---
     @property
@@ -105,130 +266,145 @@ class Analizador:
     def _analizar_ast(self, ast_obj: AST) -> Dict[str, Any]:
         """
         Método central y privado que inspecciona el AST y determina las
-        características estructurales para el análisis de complejidad.
+        características estructurales para el análisis de complejidad: la
+        profundidad máxima de bucles anidados, si existe una salida temprana
+        (break/return) dentro de un bucle y si alguna función se invoca a sí misma.
         """
         max_profundidad = 0
         hay_salida_temprana = False
-
-        # ast.walk nos permite recorrer todos los nodos del árbol
-        for node in ast.walk(ast_obj._arbol):
-            # Buscamos bucles (For, While)
-            if isinstance(node, (ast.For, ast.While)):
-                profundidad_actual = self._calcular_profundidad_anidacion(node)
-                if profundidad_actual > max_profundidad:
-                    max_profundidad = profundidad_actual
-
-            # Buscamos condiciones de salida temprana (break, return dentro de bucles)
-            if isinstance(node, (ast.For, ast.While)):
-                for sub_node in ast.walk(node):
-                    if isinstance(sub_node, (ast.Break, ast.Return)):
-                        hay_salida_temprana = True
-                        break
-            if hay_salida_temprana:
-                break
+        hay_recursion = False
+        analisis_truncado = False
+
+        # Recorrido iterativo con pila explícita (sin recursión ni generadores).
+        # Cada entrada guarda el nodo, la profundidad de bucles que lo envuelve
+        # y los nombres de las funciones que lo contienen.
+        pila = [(ast_obj._arbol, 0, ())]
+        pop = pila.pop
+        push = pila.append
+        tipo_de = _TIPOS_NODO.get
+        limite = self.MAX_LOOP_DEPTH
+        while pila:
+            nodo, profundidad, funciones = pop()
+            tipo = tipo_de(type(nodo))
+            if tipo is None:
+                pass
+            elif tipo == _BUCLE:
+                profundidad += 1
+                if profundidad > limite:
+                    # No se desciende a los bucles que superan el límite.
+                    analisis_truncado = True
+                    continue
+                if profundidad > max_profundidad:
+                    max_profundidad = profundidad
+            elif tipo == _SALIDA:
+                if profundidad > 0:
+                    hay_salida_temprana = True
+            elif tipo == _FUNCION:
+                funciones = funciones + (nodo.name,)
+            elif type(nodo.func) is ast.Name and nodo.func.id in funciones:  # _LLAMADA
+                hay_recursion = True
+
+            for hijo in ast.iter_child_nodes(nodo):
+                push((hijo, profundidad, funciones))
+
+        # El mejor caso sigue las mismas reglas que EfficiencyVisitor, de modo que
+        # ambas rutas de analizar dan las mismas cotas para el mismo código.
+        grado_mejor = _grado_mejor_caso(ast_obj._arbol.body)[0]
 
         return {
             "max_profundidad": max_profundidad,
-            "hay_salida_temprana": hay_salida_temprana
+            "profundidad_mejor": min(grado_mejor, max_profundidad),
+            "hay_salida_temprana": hay_salida_temprana,
+            "hay_recursion": hay_recursion,
+            "analisis_truncado": analisis_truncado
         }
 
-    def _calcular_profundidad_anidacion(self, nodo_bucle: ast.AST, profundidad_inicial=1) -> int:
-        """
-        Calcula la profundidad de los bucles anidados a partir de un nodo inicial.
-        """
-        max_profundidad_hijo = 0
-        # Recorremos solo los hijos directos del cuerpo del bucle
-        for hijo in ast.iter_child_nodes(nodo_bucle):
-            if isinstance(hijo, (ast.For, ast.While)):
-                # Si encontramos un bucle anidado, llamamos recursivamente
-                profundidad_hijo = self._calcular_profundidad_anidacion(hijo, profundidad_inicial + 1)
-                if profundidad_hijo > max_profundidad_hijo:
-                    max_profundidad_hijo = profundidad_hijo
-
-        return max(profundidad_inicial, max_profundidad_hijo)
+    def _obtener_notaciones(self) -> Tuple[str, str, str]:
+        """Devuelve las notaciones (O, Ω, Θ) precalculadas para el último análisis."""
+        return self._NOTACIONES[(
+            self._ultimo_analisis.get("max_profundidad", 0),
+            self._ultimo_analisis.get("profundidad_mejor", 0)
+        )]
 
     def calcular_o(self) -> str:
         """Calcula la cota superior asintótica (Peor Caso)."""
-        profundidad = self._ultimo_analisis.get("max_profundidad", 0)
-        if profundidad == 0:
-            return "O(1)"
-        elif profundidad == 1:
-            return "O(n)"
-        else:
-            return f"O(n^{profundidad})"
+        return self._obtener_notaciones()[0]
 
     def calcular_omega(self) -> str:
         """Calcula la cota inferior asintótica (Mejor Caso)."""
-        profundidad = self._ultimo_analisis.get("max_profundidad", 0)
-        salida_temprana = self._ultimo_analisis.get("hay_salida_temprana", False)
-
-        if profundidad == 0:
-            return "Ω(1)"
-        # Si hay una salida temprana (ej. 'break'), el mejor caso podría ser constante.
-        if salida_temprana:
-            return "Ω(1)"
-        # Si no hay salida temprana, el mejor caso es igual al peor.
-        elif profundidad == 1:
-            return "Ω(n)"
-        else:
-            return f"Ω(n^{profundidad})"
+        return self._obtener_notaciones()[1]
 
     def calcular_theta(self) -> str:
         """Calcula la cota ajustada asintótica (Caso Promedio)."""
-        o_grande = self.calcular_o()
-        omega_grande = self.calcular_omega()
+        return self._obtener_notaciones()[2]
 
-        # Si las cotas superior e inferior coinciden, tenemos una cota ajustada (Theta).
-        if o_grande.replace('O', '') == omega_grande.replace('Ω', ''):
-            return o_grande.replace('O', 'Θ')
-        else:
-            # Si no, el análisis promedio es más complejo y a menudo se alinea con el peor caso.
-            return f"No se puede determinar una cota Θ simple. El caso promedio tiende a {o_grande}."
+    def _cotas_coinciden(self) -> bool:
+        """Indica si las cotas O y Ω del último análisis son iguales."""
+        return self._ultimo_analisis.get("max_profundidad", 0) == self._ultimo_analisis.get("profundidad_mejor", 0)
 
     def generar_justificacion(self) -> str:
         """Genera la justificación matemática del análisis basado en la estructura del AST."""
         profundidad = self._ultimo_analisis.get("max_profundidad", 0)
-        salida_temprana = self._ultimo_analisis.get("hay_salida_temprana", False)
 
         if profundidad == 0:
             return "El algoritmo no contiene bucles iterativos ni llamadas recursivas, por lo que su tiempo de ejecución es constante e independiente del tamaño de la entrada."
 
-        justificacion = f"El análisis se basa en la estructura de bucles del algoritmo (Capítulo 2, Introduction to Algorithms).\n"
+        o, omega, theta = self._obtener_notaciones()
+        partes: List[str] = [f"El análisis se basa en la estructura de bucles del algoritmo (Capítulo 2, Introduction to Algorithms).\n"]
 
         if profundidad == 1:
-            justificacion += f"- **Peor Caso ({self.calcular_o()})**: Se ha identificado un bucle principal que itera sobre los elementos de la entrada. El tiempo de ejecución crece linealmente con el tamaño 'n' de la entrada.\n"
+            partes.append(f"- **Peor Caso ({o})**: Se ha identificado un bucle principal que itera sobre los elementos de la entrada. El tiempo de ejecución crece linealmente con el tamaño 'n' de la entrada.\n")
         else:
-            justificacion += f"- **Peor Caso ({self.calcular_o()})**: Se ha detectado una estructura de bucles anidados con una profundidad máxima de {profundidad}. Esto resulta en una complejidad polinómica, ya que por cada elemento del bucle exterior, el interior se ejecuta 'n' veces.\n"
+            partes.append(f"- **Peor Caso ({o})**: Se ha detectado una estructura de bucles anidados con una profundidad máxima de {profundidad}. Esto resulta en una complejidad polinómica, ya que por cada elemento del bucle exterior, el interior se ejecuta 'n' veces.\n")
 
-        if salida_temprana:
-            justificacion += f"- **Mejor Caso ({self.calcular_omega()})**: El algoritmo contiene una condición de salida temprana (ej. 'break' o 'return' dentro de un bucle). En el mejor de los casos, esta condición se cumple en la primera iteración, resultando en un tiempo de ejecución constante.\n"
+        if not self._cotas_coinciden():
+            partes.append(f"- **Mejor Caso ({omega})**: El algoritmo contiene una condición de salida temprana (ej. 'break' o 'return' dentro de un bucle for), bucles while cuya condición puede dejar de cumplirse en las primeras evaluaciones o bucles que solo se ejecutan en una de las ramas de un condicional. En el mejor de los casos esos bucles ejecutan su cuerpo un número constante de veces, por lo que el mejor caso crece más despacio que el peor.\n")
         else:
-            justificacion += f"- **Mejor Caso ({self.calcular_omega()})**: No se han detectado condiciones de salida temprana. Por lo tanto, el algoritmo debe recorrer la totalidad de la estructura de bucles incluso en el mejor de los casos, igualando la complejidad del peor caso.\n"
+            partes.append(f"- **Mejor Caso ({omega})**: No se han detectado condiciones de salida temprana. Por lo tanto, el algoritmo debe recorrer la totalidad de la estructura de bucles incluso en el mejor de los casos, igualando la complejidad del peor caso.\n")
 
-        justificacion += f"- **Caso Promedio ({self.calcular_theta()})**: {'Dado que las cotas del mejor y peor caso coinciden, la complejidad promedio es ajustada.' if self.calcular_o().replace('O', '') == self.calcular_omega().replace('Ω', '') else 'La complejidad promedio es más difícil de determinar, pero tiende a seguir el comportamiento del peor caso en la mayoría de las distribuciones de entrada.'}"
+        partes.append(f"- **Caso Promedio ({theta})**: {'Dado que las cotas del mejor y peor caso coinciden, la complejidad promedio es ajustada.' if self._cotas_coinciden() else 'La complejidad promedio es más difícil de determinar, pero tiende a seguir el comportamiento del peor caso en la mayoría de las distribuciones de entrada.'}")
 
-        return justificacion
+        if self._ultimo_analisis.get("analisis_truncado", False):
+            partes.append(f"\n- **Nota**: La estructura de bucles supera la profundidad máxima analizada ({self.MAX_LOOP_DEPTH}). Los bucles más internos no se han inspeccionado, por lo que la complejidad real es al menos la indicada.")
+
+        return "".join(partes)
 
     def _analizar_eficiencia(self, ast_obj: AST) -> Dict[str, Any]:
         """
-        Instancia y ejecuta el EfficiencyVisitor para obtener los resultados
-        del análisis matemático.
+        Obtiene del AST los costos construidos por EfficiencyVisitor y resuelve
+        el análisis matemático. Los resultados se memorizan por la estructura
+        del AST, de modo que reanalizar el mismo algoritmo no repite el trabajo
+        de sympy.
         """
-        visitor = EfficiencyVisitor()
-        visitor.visit(ast_obj._arbol)
+        # Se incluyen los atributos (línea, columna) porque forman parte del desglose.
+        clave = hashlib.blake2b(ast.dump(ast_obj._arbol, include_attributes=True).encode()).digest()
+        resultado = self._sym_cache.get(clave)
+        if resultado is not None:
+            self._sym_cache.move_to_end(clave)
+            return resultado
+
+        desglose_costos, costo_peor, costo_mejor = ast_obj.analizar_eficiencia()
 
         # Resuelve las sumatorias para obtener las funciones T(n) finales
-        t_n_peor = visitor.worst_case_cost.doit()
-        t_n_mejor = visitor.best_case_cost.doit()
+        t_n_peor = costo_peor.doit()
+        t_n_mejor = costo_mejor.doit()
 
-        return {
-            "desglose_costos": visitor.line_costs,
+        resultado = {
+            "desglose_costos": desglose_costos,
             "funcion_peor_caso": t_n_peor,
             "funcion_mejor_caso": t_n_mejor,
             "funcion_peor_caso_str": str(t_n_peor),
-            "funcion_mejor_caso_str": str(t_n_mejor)
+            "funcion_mejor_caso_str": str(t_n_mejor),
+            # Término dominante de cada función, usado para O(n) y Ω(n)
+            "orden_peor": _termino_dominante(t_n_peor),
+            "orden_mejor": _termino_dominante(t_n_mejor)
         }
 
+        self._sym_cache[clave] = resultado
+        if len(self._sym_cache) > self._SYM_CACHE_MAXSIZE:
+            self._sym_cache.popitem(last=False)
+        return resultado
+
     def analizar(self, algoritmo: Algoritmo) -> Complejidad:
         """
         Realiza el análisis completo de un algoritmo, orquestando la creación
@@ -237,40 +413,65 @@ class Analizador:
         if not algoritmo.arbol_sintactico:
             raise ValueError("El algoritmo no tiene un AST. Ejecute el parser primero.")
 
-        # 1. Realizar el análisis de eficiencia detallado
-        self._ultimo_analisis = self._analizar_eficiencia(algoritmo.arbol_sintactico)
+        # 1. Recorrido estructural: los algoritmos sin bucles anidados ni recursión
+        #    se resuelven directamente, sin pasar por sympy.
+        estructura = self._analizar_ast(algoritmo.arbol_sintactico)
+        if self._es_ruta_estructural(estructura):
+            return self._analizar_estructural(algoritmo, estructura)
+        return self._analizar_simbolico(algoritmo)
 
-        t_n_peor = self._ultimo_analisis["funcion_peor_caso"]
-        t_n_mejor = self._ultimo_analisis["funcion_mejor_caso"]
-        n = sympy.Symbol('n')
+    @staticmethod
+    def _es_ruta_estructural(estructura: Dict[str, Any]) -> bool:
+        """
+        Indica si el recorrido estructural basta para resolver la complejidad.
+        Si el anidamiento supera MAX_LOOP_DEPTH tampoco se intenta el análisis simbólico.
+        """
+        return ((estructura["max_profundidad"] <= 1 and not estructura["hay_recursion"])
+                or estructura["analisis_truncado"])
 
-        # 2. Derivar O(n) del peor caso y Ω(n) del mejor caso
-        orden_peor = sympy.O(t_n_peor, (n, sympy.oo)).args[0]
-        orden_mejor = sympy.O(t_n_mejor, (n, sympy.oo)).args[0]
+    def _analizar_estructural(self, algoritmo: Algoritmo, estructura: Dict[str, Any]) -> Complejidad:
+        """Resuelve la complejidad a partir del recorrido estructural, sin sympy."""
+        self._ultimo_analisis = estructura
+        notacion_o, notacion_omega, notacion_theta = self._obtener_notaciones()
+        self.complejidad = Complejidad(
+            id=algoritmo.id,
+            notacion_o=notacion_o,
+            notacion_omega=notacion_omega,
+            notacion_theta=notacion_theta,
+            justificacion=self.generar_justificacion()
+        )
+        return self.complejidad
 
-        notacion_o = f"O({orden_peor})"
-        notacion_omega = f"Ω({orden_mejor})"
+    def _analizar_simbolico(self, algoritmo: Algoritmo) -> Complejidad:
+        """Resuelve la complejidad con las funciones de coste T(n) de EfficiencyVisitor."""
+        # 2. Realizar el análisis de eficiencia detallado
+        self._ultimo_analisis = dict(self._analizar_eficiencia(algoritmo.arbol_sintactico))
 
-        # 3. Calcular Theta(Θ) si las cotas coinciden
-        notacion_theta = f"Θ({orden_peor})" if orden_peor == orden_mejor else "No aplicable"
+        # 3. Derivar O(n) del peor caso y Ω(n) del mejor caso
+        orden_peor = self._ultimo_analisis["orden_peor"]
+        orden_mejor = self._ultimo_analisis["orden_mejor"]
 
-        # 4. Generar la justificación matemática y detallada
-        justificacion = (
+        # 4. Theta(Θ) solo se establece si las cotas coinciden
+        notacion_o, notacion_omega, notacion_theta = _notaciones_asintoticas(orden_peor, orden_mejor)
+
+        # 5. Generar la justificación matemática y detallada
+        partes: List[str] = [
             f"El análisis de eficiencia se ha realizado línea por línea, generando funciones de coste para el peor y mejor caso, "
             f"basado en los principios del Capítulo 2 de 'Introduction to Algorithms'.\n\n"
             f"Función de Peor Caso T(n) = {self._ultimo_analisis['funcion_peor_caso_str']}\n"
             f"Función de Mejor Caso T(n) = {self._ultimo_analisis['funcion_mejor_caso_str']}\n\n"
             f"**Desglose de Costos por Línea:**\n"
-        )
+        ]
         for linea, costo, desc in self._ultimo_analisis['desglose_costos']:
-            justificacion += f"- Línea {linea}: {desc} | Costo -> {costo}\n"
+            partes.append(f"- Línea {linea}: {desc} | Costo -> {costo}\n")
 
-        justificacion += f"\n**Conclusión Asintótica:**\n"
-        justificacion += f"- **Peor Caso (O)**: El término dominante de la función de peor caso es **{orden_peor}**, resultando en una complejidad de **{notacion_o}**.\n"
-        justificacion += f"- **Mejor Caso (Ω)**: El término dominante de la función de mejor caso es **{orden_mejor}**, resultando en una complejidad de **{notacion_omega}**.\n"
-        justificacion += f"- **Caso Promedio (Θ)**: {f'Dado que las cotas del mejor y peor caso coinciden, la complejidad es **{notacion_theta}**.' if notacion_theta != 'No aplicable' else 'Las cotas del mejor y peor caso difieren, por lo que no se establece una cota ajustada Θ simple.'}"
+        partes.append(f"\n**Conclusión Asintótica:**\n")
+        partes.append(f"- **Peor Caso (O)**: El término dominante de la función de peor caso es **{orden_peor}**, resultando en una complejidad de **{notacion_o}**.\n")
+        partes.append(f"- **Mejor Caso (Ω)**: El término dominante de la función de mejor caso es **{orden_mejor}**, resultando en una complejidad de **{notacion_omega}**.\n")
+        partes.append(f"- **Caso Promedio (Θ)**: {f'Dado que las cotas del mejor y peor caso coinciden, la complejidad es **{notacion_theta}**.' if notacion_theta != 'No aplicable' else 'Las cotas del mejor y peor caso difieren, por lo que no se establece una cota ajustada Θ simple.'}")
+        justificacion = "".join(partes)
 
-        # 5. Crear y devolver el objeto Complejidad
+        # 6. Crear y devolver el objeto Complejidad
         self.complejidad = Complejidad(
             id=algoritmo.id,
             notacion_o=notacion_o,
@@ -278,4 +479,56 @@ class Analizador:
             notacion_theta=notacion_theta,
             justificacion=justificacion
         )
-        return self.complejidad
\ No newline at end of file
+        return self.complejidad
+
+    def analizar_lote(self, algoritmos: List[Algoritmo]) -> List[Complejidad]:
+        """
+        Analiza varios algoritmos independientes y devuelve las complejidades en
+        el mismo orden de entrada.
+
+        Los que se resuelven por la ruta estructural se analizan en serie, porque
+        cuestan menos que enviarlos a otro proceso. Los de la ruta simbólica van
+        a un pool de procesos (sympy está limitado por el GIL, así que no se usan
+        hilos) cuando hay al menos _MIN_LOTE_PARALELO y más de una CPU. El pool
+        usa 'spawn': los clientes gRPC del LLMService ya creados en este proceso
+        no deben heredarse con fork.
+
+        A diferencia de analizar, no modifica el estado del Analizador
+        (complejidad y último análisis).
+        """
+        for algoritmo in algoritmos:
+            if not algoritmo.arbol_sintactico:
+                raise ValueError("El algoritmo no tiene un AST. Ejecute el parser primero.")
+
+        resultados: List[Complejidad | None] = [None] * len(algoritmos)
+        simbolicos: List[int] = []
+        complejidad, ultimo_analisis = self._complejidad, self._ultimo_analisis
+        try:
+            for i, algoritmo in enumerate(algoritmos):
+                estructura = self._analizar_ast(algoritmo.arbol_sintactico)
+                if self._es_ruta_estructural(estructura):
+                    resultados[i] = self._analizar_estructural(algoritmo, estructura)
+                else:
+                    simbolicos.append(i)
+
+            if len(simbolicos) < self._MIN_LOTE_PARALELO or (os.cpu_count() or 1) < 2:
+                # En serie se reutiliza la caché simbólica del Analizador.
+                for i in simbolicos:
+                    resultados[i] = self._analizar_simbolico(algoritmos[i])
+                return resultados
+        finally:
+            self._complejidad, self._ultimo_analisis = complejidad, ultimo_analisis
+
+        pendientes = [algoritmos[i] for i in simbolicos]
+        with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            complejidades = executor.map(
+                _analizar_en_proceso,
+                [algoritmo.id for algoritmo in pendientes],
+                [algoritmo.codigo_fuente for algoritmo in pendientes],
+                [algoritmo.tipo_algoritmo for algoritmo in pendientes],
+                [algoritmo.arbol_sintactico.codigo for algoritmo in pendientes]
+            )
+            for i, resultado in zip(simbolicos, complejidades):
+                resultados[i] = resultado
+        return resultados
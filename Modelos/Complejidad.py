@@ -1,4 +1,5 @@
 from __future__ import annotations
+import sys
 from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
@@ -10,11 +11,15 @@ class Complejidad:
     Almacena el resultado del análisis de complejidad.
     Mapea la clase 'Complejidad' del diagrama UML.
     """
+    __slots__ = ('_id', '_notacion_o', '_notacion_omega', '_notacion_theta', '_justificacion_matematica', '_analizador', '_reporte')
+
     def __init__(self, id: int, notacion_o: str, notacion_omega: str, notacion_theta: str, justificacion: str):
         self._id = id
-        self._notacion_o = notacion_o
-        self._notacion_omega = notacion_omega
-        self._notacion_theta = notacion_theta
+        # Las notaciones provienen de un conjunto pequeño de valores; se internan
+        # para que las instancias compartan la misma cadena.
+        self._notacion_o = sys.intern(notacion_o)
+        self._notacion_omega = sys.intern(notacion_omega)
+        self._notacion_theta = sys.intern(notacion_theta)
         self._justificacion_matematica = justificacion
         self._analizador: Optional[Analizador] = None
         self._reporte: Optional[Reporte] = None
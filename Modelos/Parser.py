@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+import asyncio
+import threading
+from typing import TYPE_CHECKING, ClassVar, List
 
 from Servicios.Grammar import Grammar
 from Servicios.LLMService import LLMService
@@ -10,10 +12,19 @@ if TYPE_CHECKING:
     from .Analizador import Analizador
 
 class Parser:
+    __slots__ = ('_id', '_gramatica', '_llm_service', '_analizador')
 
-    def __init__(self, id: int, gramatica: Grammar, llm_service: LLMService):
+    # Bucle de eventos persistente para parsear_batch. El SDK de Gemini guarda su
+    # cliente asíncrono por proceso, ligado al bucle en el que se creó, así que
+    # todas las llamadas síncronas reutilizan el mismo bucle en vez de abrir y
+    # cerrar uno con asyncio.run en cada lote.
+    _BUCLE: ClassVar[asyncio.AbstractEventLoop | None] = None
+    _BUCLE_LOCK: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, id: int, gramatica: Grammar | None = None, llm_service: LLMService | None = None):
         self._id = id
-        self._gramatica = gramatica
+        # Si no se indica una gramática se usa la instancia compartida.
+        self._gramatica = gramatica if gramatica is not None else Grammar.default()
         self._llm_service = llm_service
         self._analizador: Analizador | None = None
 
@@ -73,15 +84,97 @@ class Parser:
             ConnectionError: Si hay un problema con el servicio de traducción del LLM.
         """
         # 1. Validar la sintaxis usando el servicio de Gramática
-        if not self.validar_sintaxis(pseudocodigo):
-            raise SyntaxError("Error de sintaxis: El pseudocódigo no es válido según la gramática.")
+        self._verificar_entrada(pseudocodigo)
 
         # 2. Traducir a Python usando el servicio LLM
         codigo_python = self._llm_service.traducir_pseudocodigo_a_python(pseudocodigo)
+
+        # 3. Parsear el código Python y devolver el objeto AST
+        return self._construir_ast(codigo_python)
+
+    async def parsear_async(self, pseudocodigo: str) -> AST:
+        """
+        Versión asíncrona de parsear: la traducción con el LLM no bloquea, de
+        modo que varias traducciones pueden estar en curso a la vez.
+        Lanza las mismas excepciones que parsear.
+        """
+        self._verificar_entrada(pseudocodigo)
+        codigo_python = await self._llm_service.traducir_pseudocodigo_a_python_async(pseudocodigo)
+        return self._construir_ast(codigo_python)
+
+    async def parsear_batch_async(self, pseudocodigos: List[str]) -> List[AST]:
+        """
+        Parsea varios pseudocódigos lanzando sus traducciones de forma
+        concurrente, por lo que el tiempo total se acerca al de la traducción
+        más lenta en lugar de a la suma de todas. Devuelve los AST en el mismo
+        orden; si alguno falla se propaga la primera excepción.
+
+        Es la variante para quien ya gestiona su propio bucle de eventos.
+        """
+        return list(await asyncio.gather(*(self.parsear_async(p) for p in pseudocodigos)))
+
+    def parsear_batch(self, pseudocodigos: List[str]) -> List[AST]:
+        """
+        Versión síncrona de parsear_batch_async. Se ejecuta siempre sobre el
+        mismo bucle de eventos del proceso, de modo que llamadas sucesivas no
+        encuentran cerrado el bucle al que quedó ligado el cliente del SDK.
+
+        Raises:
+            RuntimeError: Si se invoca desde un bucle de eventos en ejecución;
+                          en ese caso debe usarse 'await parsear_batch_async(...)'.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("parsear_batch no puede usarse dentro de un bucle de eventos; use 'await parsear_batch_async(...)'.")
+
+        with self._BUCLE_LOCK:
+            return self._bucle().run_until_complete(self.parsear_batch_async(pseudocodigos))
+
+    @classmethod
+    def _bucle(cls) -> asyncio.AbstractEventLoop:
+        """Devuelve el bucle de eventos persistente, creándolo la primera vez."""
+        if cls._BUCLE is None or cls._BUCLE.is_closed():
+            cls._BUCLE = asyncio.new_event_loop()
+        return cls._BUCLE
+
+    def parsear_lote(self, pseudocodigos: List[str]) -> List[AST | None]:
+        """
+        Parsea varios pseudocódigos con una sola traducción por lotes del LLM.
+        La sintaxis de todos se valida una única vez y solo los válidos se
+        envían al LLM. El resultado está alineado con la entrada: la posición i
+        contiene el AST de pseudocodigos[i], o None si su sintaxis no es válida.
+
+        Raises:
+            SyntaxError: Si el código generado por el LLM para algún fragmento es inválido.
+            ConnectionError: Si hay un problema con el servicio de traducción del LLM.
+        """
+        resultados: List[AST | None] = [None] * len(pseudocodigos)
+        indices = [i for i, valido in enumerate(self._gramatica.validar_lote(pseudocodigos)) if valido]
+        if not indices:
+            return resultados
+        if self._llm_service is None:
+            raise RuntimeError("El Parser no tiene un LLMService configurado para traducir el pseudocódigo.")
+
+        traducciones = self._llm_service.traducir_batch([pseudocodigos[i] for i in indices])
+        for i, codigo in zip(indices, traducciones):
+            resultados[i] = self._construir_ast(codigo)
+        return resultados
+
+    def _verificar_entrada(self, pseudocodigo: str):
+        """Comprueba la sintaxis del pseudocódigo y que haya un servicio LLM disponible."""
+        if not self.validar_sintaxis(pseudocodigo):
+            raise SyntaxError("Error de sintaxis: El pseudocódigo no es válido según la gramática.")
+        if self._llm_service is None:
+            raise RuntimeError("El Parser no tiene un LLMService configurado para traducir el pseudocódigo.")
+
+    def _construir_ast(self, codigo_python: str) -> AST:
+        """Valida la respuesta del LLM y la convierte en un objeto AST."""
         if not codigo_python or "# Error" in codigo_python:
             raise ConnectionError(f"Error de traducción: El servicio LLM falló. Detalles: {codigo_python}")
 
-        # 3. Parsear el código Python y devolver el objeto AST
         try:
             ast_obj = AST(codigo_python)
             return ast_obj
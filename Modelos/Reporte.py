@@ -13,6 +13,7 @@ class Reporte:
     Consolida el resultado de un análisis de complejidad.
     Mapea la clase 'Reporte' del diagrama UML.
     """
+    __slots__ = ('_id', '_algoritmo_analizado', '_resultado_complejidad', '_validacion_llm', '_algoritmo', '_analizador')
 
     def __init__(self, id: int, algoritmo_analizado: Algoritmo, resultado_complejidad: Complejidad):
         self._id = id
@@ -12,6 +12,7 @@ class Usuario:
     Representa al usuario del sistema.
     Mapea la clase 'Usuario' del diagrama UML.
     """
+    __slots__ = ('_id', '_nombre', '_analizadores', '_algoritmos')
 
     def __init__(self, id: int, nombre: str):
         self._id = id
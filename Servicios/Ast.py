@@ -1,6 +1,100 @@
 from __future__ import annotations
 import ast
-from typing import List, Dict, Any
+from bisect import bisect_left
+from collections import deque
+from typing import TYPE_CHECKING, Callable, List, Dict, Any, Set, Tuple
+
+if TYPE_CHECKING:
+    import sympy
+
+# Etiqueta de cada tipo de bucle. Los nodos del AST son clases concretas, por lo
+# que basta comparar type(nodo) en lugar de recorrer la MRO con isinstance.
+_LOOP_TYPES: Dict[type, str] = {ast.For: 'For', ast.While: 'While'}
+
+
+class _Collector:
+    """
+    Recorre el AST una sola vez y reúne a la vez todos los datos que exponen
+    los métodos extraer_* y contar_nodos de la clase AST, además de los bucles
+    while que contienen un break, necesarios para el análisis de eficiencia.
+
+    El recorrido es iterativo, en anchura y con una cola explícita (mismo orden
+    que ast.walk, pero sin generadores por nodo), y despacha cada nodo con una
+    tabla indexada por su tipo en lugar de una cadena de isinstance.
+    """
+
+    def __init__(self):
+        self.funciones: List[str] = []
+        self.bucles: List[str] = []
+        self.condicionales = 0
+        self.llamadas: set[str] = set()
+        self.n_nodos = 0
+        self.whiles: List[ast.While] = []
+        self.breaks: List[Tuple[int, int]] = []
+        self._manejadores: Dict[type, Callable[[ast.AST], None]] = {
+            ast.FunctionDef: self._visitar_funcion,
+            **{tipo: self._visitar_bucle for tipo in _LOOP_TYPES},
+            ast.If: self._visitar_if,
+            ast.Call: self._visitar_llamada,
+            ast.Break: self._visitar_break,
+        }
+
+    def recorrer(self, arbol: ast.AST):
+        """Recorre todos los nodos de 'arbol' y acumula sus datos."""
+        # Los métodos y globales usados en el bucle se enlazan a variables locales,
+        # cuyo acceso es el más barato para el intérprete.
+        obtener_manejador = self._manejadores.get
+        pendientes = deque((arbol,))
+        siguiente, agregar = pendientes.popleft, pendientes.append
+        NodoAST = ast.AST
+        n_nodos = 0
+        while pendientes:
+            nodo = siguiente()
+            n_nodos += 1
+            manejador = obtener_manejador(type(nodo))
+            if manejador is not None:
+                manejador(nodo)
+            for campo in nodo._fields:
+                valor = getattr(nodo, campo, None)
+                if isinstance(valor, NodoAST):
+                    agregar(valor)
+                elif isinstance(valor, list):
+                    for item in valor:
+                        if isinstance(item, NodoAST):
+                            agregar(item)
+        self.n_nodos += n_nodos
+
+    def _visitar_funcion(self, node: ast.FunctionDef):
+        self.funciones.append(node.name)
+
+    def _visitar_bucle(self, node: ast.For | ast.While):
+        self.bucles.append(_LOOP_TYPES[type(node)])
+        if type(node) is ast.While:
+            self.whiles.append(node)
+
+    def _visitar_break(self, node: ast.Break):
+        self.breaks.append((node.lineno, node.col_offset))
+
+    def whiles_con_break(self) -> Set[ast.While]:
+        """
+        Devuelve los while que contienen algún break en su subárbol. Como cada
+        subárbol ocupa un rango contiguo del código fuente, basta comprobar si
+        la posición de algún break cae dentro del rango del while.
+        """
+        breaks = sorted(self.breaks)
+        resultado = set()
+        for nodo in self.whiles:
+            i = bisect_left(breaks, (nodo.lineno, nodo.col_offset))
+            if i < len(breaks) and breaks[i] < (nodo.end_lineno, nodo.end_col_offset):
+                resultado.add(nodo)
+        return resultado
+
+    def _visitar_if(self, node: ast.If):
+        self.condicionales += 1
+
+    def _visitar_llamada(self, node: ast.Call):
+        if type(node.func) is ast.Name:
+            self.llamadas.add(node.func.id)
 
 
 class AST:
@@ -13,6 +107,8 @@ class AST:
     código (potencialmente traducido desde pseudocódigo por un LLM) y la
     lógica de análisis de complejidad.
     """
+    __slots__ = ('_codigo', '_arbol', '_funcs', '_bucles', '_ifs', '_calls', '_n_nodes', '_analyzed',
+                 '_whiles_con_break', '_eficiencia')
 
     def __init__(self, codigo: str):
         """
@@ -26,6 +122,60 @@ class AST:
         """
         self._codigo = codigo
         self._arbol: ast.Module = ast.parse(codigo)
+        # Resultados del recorrido único del árbol; se calculan en el primer acceso.
+        self._analyzed = False
+        self._funcs: List[str] = []
+        self._bucles: List[str] = []
+        self._ifs = 0
+        self._calls: List[str] = []
+        self._n_nodes = 0
+        self._whiles_con_break: Set[ast.While] = set()
+        self._eficiencia: Tuple[List[Tuple[int, str, str]], sympy.Expr, sympy.Expr] | None = None
+
+    @property
+    def codigo(self) -> str:
+        """Código Python a partir del cual se construyó el árbol."""
+        return self._codigo
+
+    def _ensure_analyzed(self):
+        """
+        Recorre el AST una única vez y guarda funciones, bucles, condicionales,
+        llamadas y número de nodos para las consultas posteriores.
+        """
+        if self._analyzed:
+            return
+        colector = _Collector()
+        colector.recorrer(self._arbol)
+        self._funcs = colector.funciones
+        self._bucles = colector.bucles
+        self._ifs = colector.condicionales
+        self._calls = sorted(colector.llamadas)  # Únicos y ordenados
+        self._n_nodes = colector.n_nodos
+        self._whiles_con_break = colector.whiles_con_break()
+        self._analyzed = True
+
+    def analizar_eficiencia(self) -> Tuple[List[Tuple[int, str, str]], sympy.Expr, sympy.Expr]:
+        """
+        Construye con EfficiencyVisitor las funciones de coste del peor y mejor
+        caso y memoriza el resultado en la instancia.
+
+        EfficiencyVisitor sigue haciendo su propio recorrido del árbol (con un
+        visitante anidado por bloque); de la pasada de _Collector solo recibe,
+        precalculado, qué bucles while contienen un break.
+
+        Returns:
+            Tuple: (desglose de costos por línea, costo del peor caso, costo del mejor caso),
+            con las sumatorias aún sin resolver.
+        """
+        if self._eficiencia is None:
+            # Importación local: sympy solo se carga si se pide el análisis de eficiencia.
+            from .EfficiencyVisitor import EfficiencyVisitor
+
+            self._ensure_analyzed()
+            visitor = EfficiencyVisitor(whiles_con_break=self._whiles_con_break)
+            visitor.visit(self._arbol)
+            self._eficiencia = (visitor.line_costs, visitor.worst_case_cost, visitor.best_case_cost)
+        return self._eficiencia
 
     def extraer_funciones(self) -> List[str]:
         """
@@ -34,11 +184,8 @@ class AST:
         Returns:
             List[str]: Una lista con los nombres de las funciones (def).
         """
-        return [
-            nodo.name
-            for nodo in ast.walk(self._arbol)
-            if isinstance(nodo, ast.FunctionDef)
-        ]
+        self._ensure_analyzed()
+        return list(self._funcs)
 
     def extraer_bucles(self) -> List[str]:
         """
@@ -47,13 +194,8 @@ class AST:
         Returns:
             List[str]: Una lista de cadenas, como ['For', 'While'].
         """
-        tipos_bucles = []
-        for nodo in ast.walk(self._arbol):
-            if isinstance(nodo, ast.For):
-                tipos_bucles.append('For')
-            elif isinstance(nodo, ast.While):
-                tipos_bucles.append('While')
-        return tipos_bucles
+        self._ensure_analyzed()
+        return list(self._bucles)
 
     def extraer_condicionales(self) -> int:
         """
@@ -64,7 +206,8 @@ class AST:
         Returns:
             int: El número de nodos 'if' (ast.If).
         """
-        return sum(1 for nodo in ast.walk(self._arbol) if isinstance(nodo, ast.If))
+        self._ensure_analyzed()
+        return self._ifs
 
     def extraer_llamadas(self) -> List[str]:
         """
@@ -73,11 +216,8 @@ class AST:
         Returns:
             List[str]: Una lista con los nombres de las funciones en nodos Call.
         """
-        llamadas = []
-        for nodo in ast.walk(self._arbol):
-            if isinstance(nodo, ast.Call) and isinstance(nodo.func, ast.Name):
-                llamadas.append(nodo.func.id)
-        return sorted(list(set(llamadas)))  # Devolver únicos y ordenados
+        self._ensure_analyzed()
+        return list(self._calls)
 
     def contar_nodos(self) -> int:
         """
@@ -86,7 +226,8 @@ class AST:
         Returns:
             int: La cantidad total de nodos.
         """
-        return sum(1 for _ in ast.walk(self._arbol))
+        self._ensure_analyzed()
+        return self._n_nodes
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -102,19 +243,38 @@ class AST:
 
     def _ast_a_dict(self, nodo: ast.AST) -> Dict[str, Any] | List[Any] | Any:
         """
-        Función auxiliar recursiva para convertir un nodo del AST a diccionario.
-        """
-        if isinstance(nodo, ast.AST):
-            # Obtiene el nombre de la clase del nodo (ej. 'Module', 'FunctionDef')
-            resultado = {'_type': nodo.__class__.__name__}
-            # Itera sobre los campos definidos para ese tipo de nodo
-            for campo, valor in ast.iter_fields(nodo):
-                resultado[campo] = self._ast_a_dict(valor)
-            return resultado
-        elif isinstance(nodo, list):
-            return [self._ast_a_dict(item) for item in nodo]
-        # Devuelve los tipos primitivos tal cual
-        return nodo
+        Función auxiliar para convertir un nodo del AST a diccionario.
+
+        Usa una pila explícita en lugar de recursión, por lo que árboles muy
+        profundos no alcanzan el límite de recursión de Python. Cada contenedor
+        se crea con sus claves en orden y se rellena al procesar sus hijos.
+        """
+        raiz: Dict[str, Any] = {}
+        pila: List[tuple] = [(nodo, raiz, 'raiz')]
+        while pila:
+            valor, contenedor, clave = pila.pop()
+            if isinstance(valor, ast.AST):
+                # Nombre de la clase del nodo (ej. 'Module', 'FunctionDef') y sus campos.
+                # Los valores primitivos se copian directamente, sin pasar por la pila.
+                resultado = {'_type': type(valor).__name__}
+                for campo in valor._fields:
+                    hijo = getattr(valor, campo, None)
+                    if isinstance(hijo, (ast.AST, list)):
+                        resultado[campo] = None
+                        pila.append((hijo, resultado, campo))
+                    else:
+                        resultado[campo] = hijo
+                contenedor[clave] = resultado
+            elif isinstance(valor, list):
+                elementos = list(valor)
+                for k, item in enumerate(valor):
+                    if isinstance(item, (ast.AST, list)):
+                        pila.append((item, elementos, k))
+                contenedor[clave] = elementos
+            else:
+                # Devuelve los tipos primitivos tal cual
+                contenedor[clave] = valor
+        return raiz['raiz']
 
 
 # --- Ejemplo de Uso ---
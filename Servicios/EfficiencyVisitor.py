@@ -1,6 +1,7 @@
 from __future__ import annotations
 import ast
-from typing import List, Tuple, Dict
+import itertools
+from typing import List, Set, Tuple, Dict
 
 try:
     import sympy
@@ -8,31 +9,62 @@ except ImportError:
     print("Dependencia no encontrada. Por favor, instale 'sympy' usando: pip install sympy")
     sympy = None
 
+# Símbolos compartidos por todos los visitantes (n, índices de sumatoria y t_j).
+if sympy:
+    _N = sympy.Symbol('n')
+    _I = sympy.Symbol('i')
+    _J = sympy.Symbol('j')
+    _TJ_MEJOR = sympy.Symbol('t_j_mejor', positive=True, integer=True)
+
+
+def _sumatoria(expr: sympy.Expr, indice: sympy.Symbol, limite: sympy.Expr) -> sympy.Expr:
+    """
+    Construye la sumatoria de 'expr' con 'indice' de 1 a 'limite'. Si el término
+    no depende del índice se devuelve directamente la forma cerrada expr*limite,
+    evitando anidar objetos Sum que sympy tendría que resolver después.
+    """
+    if indice not in expr.free_symbols:
+        return expr * limite
+    return sympy.Sum(expr, (indice, 1, limite))
+
 
 class EfficiencyVisitor(ast.NodeVisitor):
     """
     Recorre el AST para construir funciones de eficiencia simbólicas T(n)
-    para el mejor y peor caso, utilizando sympy para el cálculo.
+    para el mejor y peor caso, utilizando sympy para el cálculo. Cada bloque
+    (cuerpo de bucle o rama de un if) se analiza con un visitante anidado.
     """
 
-    def __init__(self):
+    def __init__(self, counter: itertools.count | None = None, whiles_con_break: Set[ast.While] | None = None):
+        """
+        Args:
+            counter: Contador de constantes compartido con el visitante padre, de
+                modo que cada constante c_k sea única en toda la función T(n).
+            whiles_con_break: Bucles while que contienen un break, ya calculados
+                por el recorrido de la clase AST. Si no se indican, cada while
+                recorre su propio subárbol para averiguarlo.
+        """
         if not sympy:
             raise RuntimeError("La librería 'sympy' es necesaria para el análisis de eficiencia.")
 
         # Símbolos base para el análisis
-        self.n = sympy.Symbol('n')
-        self.const_idx = 1
+        self.n = _N
+        self._counter = counter if counter is not None else itertools.count(1)
+        self._whiles_con_break = whiles_con_break
 
         # Costos y desglose por línea
         self.line_costs: List[Tuple[int, str, str]] = []
         self.worst_case_cost = sympy.Integer(0)
         self.best_case_cost = sympy.Integer(0)
 
+        # Salidas tempranas vistas en este bloque: un break abandona el bucle que
+        # lo contiene directamente; un return abandona todos los que lo envuelven.
+        self.hay_break = False
+        self.hay_return = False
+
     def _get_const(self) -> sympy.Symbol:
         """Genera una nueva constante simbólica (c_1, c_2, ...)."""
-        const = sympy.Symbol(f'c_{self.const_idx}')
-        self.const_idx += 1
-        return const
+        return sympy.Symbol(f'c_{next(self._counter)}')
 
     def _add_cost(self, node: ast.AST, description: str, worst_cost: sympy.Expr, best_cost: sympy.Expr = None):
         """Método unificado para añadir costos y registrar el desglose."""
@@ -61,12 +93,12 @@ class EfficiencyVisitor(ast.NodeVisitor):
         self._add_cost(node, "Evaluación de condición if", costo_test)
 
         # Analiza la rama 'if'
-        visitor_if_body = EfficiencyVisitor()
+        visitor_if_body = EfficiencyVisitor(counter=self._counter, whiles_con_break=self._whiles_con_break)
         for sub_node in node.body:
             visitor_if_body.visit(sub_node)
 
         # Analiza la rama 'else' (si existe)
-        visitor_else_body = EfficiencyVisitor()
+        visitor_else_body = EfficiencyVisitor(counter=self._counter, whiles_con_break=self._whiles_con_break)
         if node.orelse:
             for sub_node in node.orelse:
                 visitor_else_body.visit(sub_node)
@@ -77,6 +109,8 @@ class EfficiencyVisitor(ast.NodeVisitor):
 
         self.worst_case_cost += peor_rama
         self.best_case_cost += mejor_rama
+        self.hay_break |= visitor_if_body.hay_break or visitor_else_body.hay_break
+        self.hay_return |= visitor_if_body.hay_return or visitor_else_body.hay_return
 
         # Agrega los desgloses de ambas ramas para un reporte completo
         self.line_costs.extend([(ln, c, f"  (Rama if) {d}") for ln, c, d in visitor_if_body.line_costs])
@@ -84,25 +118,34 @@ class EfficiencyVisitor(ast.NodeVisitor):
             self.line_costs.extend([(ln, c, f"  (Rama else) {d}") for ln, c, d in visitor_else_body.line_costs])
 
     def visit_For(self, node: ast.For):
-        """Visita un bucle 'for'. Costo es una sumatoria."""
+        """
+        Visita un bucle 'for'. En el peor caso el cuerpo se ejecuta n veces. Si
+        contiene una salida temprana (un break propio o un return), en el mejor
+        caso se cumple en la primera iteración y el cuerpo se ejecuta una vez.
+        """
         iter_var = sympy.Symbol(node.target.id)
         # Simplificación: asumimos que itera n veces (de 1 a n)
         limite_superior = self.n
 
-        # Costo de inicialización y test del bucle
-        self._add_cost(node, f"Inicialización y test del bucle for", self._get_const())
+        # La constante del test se numera antes que las del cuerpo (orden del código)
+        costo_test = self._get_const()
 
         # Analiza el cuerpo del bucle
-        visitor_cuerpo = EfficiencyVisitor()
+        visitor_cuerpo = EfficiencyVisitor(counter=self._counter, whiles_con_break=self._whiles_con_break)
         for sub_node in node.body:
             visitor_cuerpo.visit(sub_node)
 
-        # La sumatoria se aplica a ambos casos (peor y mejor)
-        sumatoria_peor = sympy.Sum(visitor_cuerpo.worst_case_cost, (iter_var, 1, limite_superior))
-        sumatoria_mejor = sympy.Sum(visitor_cuerpo.best_case_cost, (iter_var, 1, limite_superior))
+        limite_mejor = 1 if visitor_cuerpo.hay_break or visitor_cuerpo.hay_return else limite_superior
+        # El return sigue abandonando los bucles exteriores; el break solo abandona este.
+        self.hay_return |= visitor_cuerpo.hay_return
+
+        # Como en el while, el test del bucle se evalúa una vez más que el cuerpo
+        self._add_cost(node, f"Inicialización y test del bucle for",
+                       worst_cost=_sumatoria(costo_test, _I, limite_superior + 1),
+                       best_cost=_sumatoria(costo_test, _I, limite_mejor + 1))
 
-        self.worst_case_cost += sumatoria_peor
-        self.best_case_cost += sumatoria_mejor
+        self.worst_case_cost += _sumatoria(visitor_cuerpo.worst_case_cost, iter_var, limite_superior)
+        self.best_case_cost += _sumatoria(visitor_cuerpo.best_case_cost, iter_var, limite_mejor)
         self.line_costs.extend([(ln, c, f"  (Dentro de for) {d}") for ln, c, d in visitor_cuerpo.line_costs])
 
     def visit_While(self, node: ast.While):
@@ -110,11 +153,19 @@ class EfficiencyVisitor(ast.NodeVisitor):
         # t_j es el número de veces que el cuerpo del while se ejecuta
         # En el peor caso, es 'n'. En el mejor caso, podría ser 1 si hay un break.
         tj_peor = self.n
-        tj_mejor = sympy.Symbol('t_j_mejor', positive=True, integer=True)  # Lo dejamos simbólico
+        # Sin break se deja simbólico, pero no depende de n: la condición puede dejar
+        # de cumplirse en las primeras evaluaciones (mejor caso de INSERTION-SORT).
+        tj_mejor = _TJ_MEJOR
+
+        # La constante del test se numera antes que las del cuerpo (orden del código)
+        costo_test = self._get_const()
 
         # Analiza el cuerpo del bucle
-        visitor_cuerpo = EfficiencyVisitor()
-        hay_break = any(isinstance(sn, ast.Break) for sn in ast.walk(node))
+        visitor_cuerpo = EfficiencyVisitor(counter=self._counter, whiles_con_break=self._whiles_con_break)
+        if self._whiles_con_break is not None:
+            hay_break = node in self._whiles_con_break
+        else:
+            hay_break = any(isinstance(sn, ast.Break) for sn in ast.walk(node))
         if hay_break:
             # Si hay un break, el mejor caso es que el bucle se ejecute 1 vez.
             tj_mejor = 1
@@ -123,12 +174,21 @@ class EfficiencyVisitor(ast.NodeVisitor):
             visitor_cuerpo.visit(sub_node)
 
         # El test se ejecuta t_j + 1 veces
-        costo_test = self._get_const()
         self._add_cost(node, f"Test de condición while",
-                       worst_cost=sympy.Sum(costo_test, (sympy.Symbol('i'), 1, tj_peor + 1)),
-                       best_cost=sympy.Sum(costo_test, (sympy.Symbol('i'), 1, tj_mejor + 1)))
+                       worst_cost=_sumatoria(costo_test, _I, tj_peor + 1),
+                       best_cost=_sumatoria(costo_test, _I, tj_mejor + 1))
 
         # El cuerpo se ejecuta t_j veces
-        self.worst_case_cost += sympy.Sum(visitor_cuerpo.worst_case_cost, (sympy.Symbol('j'), 1, tj_peor))
-        self.best_case_cost += sympy.Sum(visitor_cuerpo.best_case_cost, (sympy.Symbol('j'), 1, tj_mejor))
-        self.line_costs.extend([(ln, c, f"  (Dentro de while) {d}") for ln, c, d in visitor_cuerpo.line_costs])
\ No newline at end of file
+        self.worst_case_cost += _sumatoria(visitor_cuerpo.worst_case_cost, _J, tj_peor)
+        self.best_case_cost += _sumatoria(visitor_cuerpo.best_case_cost, _J, tj_mejor)
+        self.line_costs.extend([(ln, c, f"  (Dentro de while) {d}") for ln, c, d in visitor_cuerpo.line_costs])
+        self.hay_return |= visitor_cuerpo.hay_return
+
+    def visit_Break(self, node: ast.Break):
+        """Registra la salida temprana del bucle que contiene al break."""
+        self.hay_break = True
+
+    def visit_Return(self, node: ast.Return):
+        """Registra la salida temprana de todos los bucles que envuelven al return."""
+        self.hay_return = True
+        self.generic_visit(node)
\ No newline at end of file
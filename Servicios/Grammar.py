@@ -1,12 +1,18 @@
 from __future__ import annotations
-from typing import Dict, Any
+import hashlib
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, ClassVar, List, Optional, Tuple
 
 # Se recomienda instalar lark: pip install lark-parser
 try:
-    from lark import Lark, exceptions
+    from lark import Lark, Tree, exceptions
 except ImportError:
     print("Dependencia no encontrada. Por favor, instale 'lark-parser' usando: pip install lark-parser")
     Lark = object
+    Tree = None
 
 
 class Grammar:
@@ -14,9 +20,11 @@ class Grammar:
     Define y valida la sintaxis del pseudocódigo inspirado en el libro
     "Introduction to Algorithms" (Cormen et al.).
 
-    Esta clase utiliza la librería Lark para construir un parser basado en una
-    gramática EBNF formal. Permite validar que el pseudocódigo de entrada
-    sea sintácticamente correcto antes de proceder a su análisis.
+    Esta clase utiliza la librería Lark para construir un parser LALR(1) basado
+    en una gramática EBNF formal. El parser compilado se comparte entre todas
+    las instancias, ya que la gramática es constante. Permite validar que el
+    pseudocódigo de entrada sea sintácticamente correcto antes de proceder a
+    su análisis.
     """
 
     # Gramática EBNF que define la sintaxis del pseudocódigo estilo Cormen.
@@ -31,7 +39,8 @@ class Grammar:
                   | call_funcion
                   | return_sentencia
 
-        declaracion_funcion: IDENTIFICADOR "(" [parametro_lista] ")" sentencias
+        // La cabecera comparte prefijo con call_funcion para que la gramática sea LALR(1).
+        declaracion_funcion: IDENTIFICADOR llamada_sufijo sentencias
 
         if_sentencia: "if" condicion "then" sentencias ("else" sentencias)?
         for_sentencia: "for" IDENTIFICADOR "←" expresion ("to" | "downto") expresion "do" sentencias
@@ -44,7 +53,6 @@ class Grammar:
         asignacion: variable "←" expresion
         return_sentencia: "return" expresion
 
-        parametro_lista: IDENTIFICADOR ("," IDENTIFICADOR)*
         argumento_lista: expresion ("," expresion)*
 
         ?condicion: expresion
@@ -60,12 +68,18 @@ class Grammar:
         ?factor: ("+"|"-") factor | atomo
 
         ?atomo: NUMBER
-             | variable
              | "(" expresion ")"
-             | call_funcion
+             | referencia
 
-        variable: IDENTIFICADOR ("." IDENTIFICADOR | "[" expresion "]")*
-        call_funcion: IDENTIFICADOR "(" [argumento_lista] ")"
+        // Un identificador seguido de argumentos (llamada) o de accesos a campos e
+        // índices (variable). El prefijo común se analiza una sola vez y el sufijo
+        // se decide con un token de anticipación.
+        referencia: IDENTIFICADOR (llamada_sufijo | acceso_sufijo)?
+        llamada_sufijo: "(" [argumento_lista] ")"
+        acceso_sufijo: ("." IDENTIFICADOR | "[" expresion "]")+
+
+        variable: IDENTIFICADOR [acceso_sufijo]
+        call_funcion: IDENTIFICADOR llamada_sufijo
 
         // Un identificador puede contener letras, números, guiones bajos y guiones medios.
         IDENTIFICADOR: /[a-zA-Z_][a-zA-Z0-9_-]*/
@@ -79,41 +93,155 @@ class Grammar:
         %ignore COMMENT
     """
 
+    # Expresión para extraer las reglas de la gramática (nombre -> definición).
+    _RULE_RE = re.compile(r'^\s*\??(\w+)\s*:\s*(.+?)\s*$', re.MULTILINE)
+
+    # Comprobaciones rápidas previas a Lark. Se aplican sobre el código sin
+    # comentarios y solo descartan entradas que la gramática nunca acepta.
+    _COMENTARIO_RE = re.compile(r'//[^\n]*')
+    # Cualquier carácter fuera del alfabeto de la gramática (incluye los de control).
+    _CARACTER_INVALIDO_RE = re.compile(r'[^ \t\f\r\nA-Za-z0-9_.,()\[\]+\-*/←≤≥≠=<>]')
+    _DELIMITADORES_RE = re.compile(r'[()\[\]]')
+    _PAREJAS: ClassVar[Dict[str, str]] = {')': '(', ']': '['}
+
+    # Archivo donde Lark guarda las tablas LALR compiladas. El nombre incluye el hash
+    # de la gramática, así que cualquier cambio en ella usa un archivo nuevo.
+    _CACHE_DIR = Path(__file__).resolve().parent.parent / "grammar_cache"
+    _CACHE_TABLAS = _CACHE_DIR / f"pseudocodigo_{hashlib.sha256(_pseudocode_grammar.encode()).hexdigest()[:16]}.lark"
+
+    # Parser compilado e instancia por defecto, construidos una sola vez por proceso.
+    _compiled_parser: ClassVar[Optional[Lark]] = None
+    _default: ClassVar[Optional[Grammar]] = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    # Número de resultados de parseo (válidos o con error) que se conservan en memoria.
+    _PARSE_CACHE_MAXSIZE = 512
+
     def __init__(self):
-        if Lark is not object:
-            self.parser = Lark(self._pseudocode_grammar, start='start', parser='earley')
-        else:
-            self.parser = None
-        self._reglas = self._parse_grammar_to_dict()
-
-    def _parse_grammar_to_dict(self) -> Dict[str, str]:
-        reglas_dict = {}
-        for line in self._pseudocode_grammar.strip().split('\n'):
-            line = line.strip()
-            if not line or line.startswith('%'):
-                continue
-            if ":" in line:
-                nombre, definicion = line.split(":", 1)
-                reglas_dict[nombre.strip().replace('?', '')] = definicion.strip()
-        return reglas_dict
+        self.parser = type(self)._get_parser()
+
+    @classmethod
+    def _get_parser(cls) -> Optional[Lark]:
+        """
+        Devuelve el parser de Lark compartido, compilándolo bajo el lock en la
+        primera llamada. Devuelve None si Lark no está instalado.
+        """
+        if Lark is object:
+            return None
+        if Grammar._compiled_parser is None:
+            with Grammar._lock:
+                if Grammar._compiled_parser is None:
+                    # Las tablas LALR se guardan en disco, de modo que los siguientes
+                    # arranques las cargan en lugar de recompilar la gramática.
+                    try:
+                        cls._CACHE_DIR.mkdir(exist_ok=True)
+                        cache = str(cls._CACHE_TABLAS)
+                    except OSError:
+                        cache = True  # Directorio temporal del sistema
+                    Grammar._compiled_parser = Lark(cls._pseudocode_grammar, start='start', parser='lalr',
+                                                    lexer='contextual', cache=cache)
+        return Grammar._compiled_parser
+
+    @classmethod
+    def default(cls) -> Grammar:
+        """Devuelve la instancia compartida de Grammar, construida en la primera llamada."""
+        if Grammar._default is None:
+            instancia = cls()
+            with Grammar._lock:
+                if Grammar._default is None:
+                    Grammar._default = instancia
+        return Grammar._default
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _reglas() -> Dict[str, str]:
+        """
+        Extrae las reglas de la gramática en la primera consulta y las reutiliza
+        después; la validación de sentencias nunca necesita calcularlas.
+        """
+        return {m.group(1): m.group(2) for m in Grammar._RULE_RE.finditer(Grammar._pseudocode_grammar)}
 
     def obtener_regla(self, nombre: str) -> str | None:
-        return self._reglas.get(nombre)
+        return self._reglas().get(nombre)
 
     def listar_reglas(self) -> Dict[str, str]:
-        return self._reglas
-
-    def validar_sentencia(self, codigo: str) -> bool:
-
+        # Copia: el diccionario memorizado es compartido y no debe modificarse desde fuera.
+        return dict(self._reglas())
+
+    @staticmethod
+    @lru_cache(maxsize=_PARSE_CACHE_MAXSIZE)
+    def _parsear_cached(codigo: str) -> Tuple[Optional[Tree], Optional[str]]:
+        """
+        Parsea el código con el parser compartido y memoriza el resultado, de
+        modo que validar y parsear el mismo texto solo ejecuta Lark una vez.
+        Devuelve (árbol, None) si el código es válido o (None, mensaje de error).
+        Solo llegan aquí las entradas que superan _prefiltrar, así que la caché
+        no se llena con basura. El árbol es compartido entre llamadas y no debe
+        modificarse.
+        """
+        try:
+            return Grammar._get_parser().parse(codigo), None
+        except exceptions.LarkError as e:
+            return None, str(e)
+
+    @classmethod
+    def _prefiltrar(cls, codigo: str) -> Optional[str]:
+        """
+        Rechaza en tiempo lineal y sin invocar a Lark las entradas que no pueden
+        ser válidas: caracteres ajenos a la gramática o paréntesis y corchetes
+        desbalanceados. Devuelve el motivo del rechazo, o None si la entrada
+        debe pasar al parser.
+        """
+        texto = cls._COMENTARIO_RE.sub('', codigo)
+        if not texto.strip():
+            return "el código solo contiene comentarios."
+
+        invalido = cls._CARACTER_INVALIDO_RE.search(texto)
+        if invalido is not None:
+            return f"carácter no permitido {invalido.group()!r}."
+
+        abiertos = []
+        for delimitador in cls._DELIMITADORES_RE.findall(texto):
+            pareja = cls._PAREJAS.get(delimitador)
+            if pareja is None:
+                abiertos.append(delimitador)
+            elif not abiertos or abiertos.pop() != pareja:
+                return f"'{delimitador}' sin su apertura correspondiente."
+        if abiertos:
+            return f"'{abiertos[-1]}' sin cerrar."
+        return None
+
+    def parse_or_none(self, codigo: str) -> Optional[Tree]:
+        """
+        Devuelve el árbol de Lark del pseudocódigo, o None si no es válido
+        según la gramática.
+        """
         if self.parser is None:
             print("Lark no está instalado. No se puede validar la sintaxis.")
-            return False
+            return None
 
-        try:
-            self.parser.parse(codigo)
-            return True
-        except exceptions.LarkError as e:
-            print(f"Error de sintaxis: {e}")
-            return False
+        # La gramática exige al menos una sentencia.
+        if not codigo.strip():
+            return None
+
+        error = self._prefiltrar(codigo)
+        if error is not None:
+            print(f"Error de sintaxis: {error}")
+            return None
 
+        arbol, error = self._parsear_cached(codigo)
+        if error is not None:
+            print(f"Error de sintaxis: {error}")
+        return arbol
 
+    def validar_sentencia(self, codigo: str) -> bool:
+        return self.parse_or_none(codigo) is not None
+
+    def validar_lote(self, codigos: List[str]) -> List[bool]:
+        """
+        Valida varios fragmentos independientes y devuelve los resultados en el
+        orden de entrada. Se valida en serie: arrancar procesos y enviarles el
+        código cuesta más que parsearlo, y los repetidos ya salen de la caché
+        de _parsear_cached.
+        """
+        return [self.validar_sentencia(codigo) for codigo in codigos]
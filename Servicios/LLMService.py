@@ -1,10 +1,19 @@
 from __future__ import annotations
+import asyncio
 import os
+import re
 import json
+import hashlib
+import tempfile
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, ClassVar, Dict, Optional, List, Tuple
 from pathlib import Path
 
+from .PromptCache import PromptCache
+from .RateLimiter import AsyncTokenBucket
 
 # Dependencias (asegúrate de tenerlas instaladas)
 # pip install python-dotenv google-generativeai
@@ -19,32 +28,215 @@ from pathlib import Path
 try:
     import google.generativeai as genai
     from google.api_core import exceptions
+    from google.api_core import retry as api_retry, retry_async as api_retry_async
 except ImportError:
     print("Dependencia no encontrada. Instale 'google-generativeai'.")
     genai = None
     File = None
 
+# El modo por lotes (Batch API) solo está disponible en el SDK 'google-genai'; es opcional.
+try:
+    from google import genai as genai_lotes
+except ImportError:
+    genai_lotes = None
+
 if TYPE_CHECKING:
     from Modelos.Analizador import Analizador
     from Modelos.Complejidad import Complejidad
     from Modelos.Algoritmo import Algoritmo
 
 
+# --- Plantillas de los prompts ---
+# La parte fija de cada prompt se define una sola vez; solo el contenido variable,
+# siempre al final, se sustituye con str.format en cada llamada.
+
+# Traducción de un pseudocódigo a Python.
+_TPL_TRADUCCION_PY = """\
+Actúa como un programador experto en algoritmos científico de la computación, especializado en traducir pseudocódigo del libro 'Introduction to Algorithms' de Cormen a Python idiomático.
+
+**Tarea:** Basado en las convenciones del libro, traduce el siguiente pseudocódigo a una función de Python.
+
+**Reglas Estrictas:**
+1.  **Salida Exclusiva de Código:** Responde **únicamente con el código Python**.
+2.  **Fidelidad al Libro:** Traduce `←` se convierte en `=`, `A.length` a `len(A)`, `≤, ≥, ≠` en `<=, >=, !=` y adapta los bucles de 1-indexado a 0-indexado.
+3.  **Manejo de índices:** Adapta los bucles y accesos de 1-indexado (Cormen) a 0-indexado (Python).
+
+**Pseudocódigo a Traducir:**
+---
+{pseudocodigo}
+---
+"""
+
+# Traducción por lotes: fragmentos delimitados por '### SNIPPET i ###'.
+_TPL_TRADUCCION_PY_LOTE = """\
+Actúa como un programador experto en algoritmos científico de la computación, especializado en traducir pseudocódigo del libro 'Introduction to Algorithms' de Cormen a Python idiomático.
+
+**Tarea:** Basado en las convenciones del libro, traduce cada uno de los fragmentos de pseudocódigo a una función de Python.
+
+**Reglas Estrictas:**
+1.  **Formato de Salida:** Para cada fragmento `### SNIPPET i ###` responde con una línea `### PY i ###` seguida **únicamente del código Python**, sin texto adicional.
+2.  **Fidelidad al Libro:** Traduce `←` se convierte en `=`, `A.length` a `len(A)`, `≤, ≥, ≠` en `<=, >=, !=` y adapta los bucles de 1-indexado a 0-indexado.
+3.  **Manejo de índices:** Adapta los bucles y accesos de 1-indexado (Cormen) a 0-indexado (Python).
+
+**Pseudocódigos a Traducir:**
+{fragmentos}
+"""
+
+# Conversión de una descripción en lenguaje natural a pseudocódigo.
+_TPL_NATURAL_A_PSEUDOCODIGO = """\
+Actúa como un experto en el libro 'Introduction to Algorithms' de Cormen.
+
+**Tarea:** Convierte la siguiente descripción a pseudocódigo, siguiendo estrictamente el estilo del libro. Convierte la siguiente descripción en lenguaje natural a pseudocódigo, siguiendo estrictamente el estilo de Cormen.
+
+**Reglas de Estilo del Libro:**
+- Usa `←` para asignaciones.
+- Usa `A.length` para la longitud de arreglos.
+- Usa bucles `for`, `while` con la sintaxis del libro.
+- Usa comentarios con `//`.
+
+**Descripción a Convertir que viene en lenguaje Natural:**
+"{texto}"
+"""
+
+# Validación de un análisis de complejidad.
+_TPL_VALIDACION = """\
+Actúa como un experto en análisis de algoritmos, al nivel de un profesor de ciencias de la computación.
+
+**Tarea:** Como un profesor de algoritmos, revisa y valida el siguiente análisis de complejidad basándote en la teoría del libro.
+
+**Tu Respuesta:** Proporciona una segunda opinión experta y concisa. Confirma si es correcto o explica claramente cualquier error o matiz, citando conceptos del libro si es relevante.
+
+**Análisis Propuesto:**
+- O(n): {notacion_o}
+- Ω(n): {notacion_omega}
+- Justificación: {justificacion}
+
+**Pseudocódigo:**
+{pseudocodigo}
+"""
+
+# Clasificación del patrón de diseño de un algoritmo.
+_TPL_CLASIFICACION = """\
+Actúa como un científico de la computación experto en paradigmas de diseño de algoritmos.
+
+**Tarea:** Identifica el principal paradigma de diseño algorítmico del pseudocódigo, usando la terminología del libro.
+
+**Instrucciones:** Responde únicamente con el nombre del patrón (ej: 'Divide and conquer', 'Dynamic programming', 'Greedy algorithm').
+ Responde únicamente con el nombre del patrón. Sé específico.
+ Ejemplos: 'Divide y Vencerás', 'Programación Dinámica', 'Algoritmo Voraz', 'Búsqueda por Fuerza Bruta', 'Backtracking'.
+ Si no identificas un patrón claro, responde 'No se identifica un patrón estándar'.
+
+**Pseudocódigo:**
+{codigo}
+"""
+
+# Clasificación por lotes: algoritmos delimitados por '### ALGORITMO i ###'.
+_TPL_CLASIFICACION_LOTE = """\
+Actúa como un científico de la computación experto en paradigmas de diseño de algoritmos.
+
+**Tarea:** Identifica el principal paradigma de diseño algorítmico de cada uno de los pseudocódigos, usando la terminología del libro.
+
+**Instrucciones:** Responde únicamente con un arreglo JSON con una cadena por algoritmo, en el mismo orden de los algoritmos.
+ Ejemplos de valores: 'Divide y Vencerás', 'Programación Dinámica', 'Algoritmo Voraz', 'Búsqueda por Fuerza Bruta', 'Backtracking'.
+ Si no identificas un patrón claro para un algoritmo, usa 'No se identifica un patrón estándar'.
+
+**Pseudocódigos:**
+{bloques}
+"""
+
+
+# Huella de las plantillas de traducción. Forma parte de la clave de las traducciones
+# en caché (que comparten las llamadas individuales y por lotes), de modo que editar
+# cualquiera de las dos plantillas invalida las traducciones previas.
+_HUELLA_TRADUCCION = hashlib.sha256(
+    "\x1f".join((_TPL_TRADUCCION_PY, _TPL_TRADUCCION_PY_LOTE)).encode()
+).hexdigest()
+
 class LLMService:
     """
     Servicio principal de IA que opera con el contexto permanente del libro
     "Introduction to Algorithms" de Cormen, usando una estrategia de caché
     para optimizar el tiempo de inicio.
+
+    Cada prompt se envía al modelo que corresponde a su rol:
+    - Modelo principal (por defecto gemini-2.5-pro): traducción a Python y
+      validación de análisis, que requieren razonamiento.
+    - Modelo rápido (por defecto gemini-2.5-flash): clasificación de patrones
+      y conversión de lenguaje natural a pseudocódigo, de respuesta corta.
     """
+    __slots__ = ('_api_key', '_modelo_genai', '_modelo', '_modelo_rapido_genai', '_modelo_rapido',
+                 '_analizador', '_libro_contexto_file', '_cache_respuestas', '_cache_disco',
+                 '_tokens_cacheados', '_limitador', '_en_curso', '_huella', '_tokens_libro')
+
     # La ruta al libro es ahora una constante interna de la clase.
     _ROOT = Path(__file__).resolve().parent.parent
     _RUTA_LIBRO = _ROOT / "Documentos" / "Introduction_to_Algorithms_by_Thomas_H_Coremen.pdf"
     _CACHE_FILE = _ROOT / "cache_file.json"
-
-    def __init__(self, modelo: str = "gemini-2.5-pro"):
+    # Referencias del libro ya obtenidas en este proceso, indexadas por nombre de archivo
+    # en Google; las comparten todas las instancias y evitan repetir genai.get_file.
+    _ARCHIVOS_CONTEXTO: ClassVar[Dict[str, File]] = {}
+    # Tokens de entrada del libro ya contados en este proceso, por huella SHA-256 del PDF.
+    _TOKENS_LIBRO: ClassVar[Dict[str, int]] = {}
+    # Tokens del libro si count_tokens falla (unas 1300 páginas a 258 tokens cada una).
+    _TOKENS_LIBRO_ESTIMADOS = 315_000
+    # Instancias de GenerativeModel ya creadas, por (nombre del modelo, instrucción de sistema).
+    _MODELOS: ClassVar[Dict[Tuple[str, Optional[str]], genai.GenerativeModel]] = {}
+    # API Key con la que ya se configuró el SDK en este proceso (ver _configurar_sdk).
+    _API_KEY_CONFIGURADA: ClassVar[Optional[str]] = None
+    # Limitador de tasa de cada API Key: la cuota es de la clave, no de la instancia.
+    _LIMITADORES: ClassVar[Dict[str, AsyncTokenBucket]] = {}
+    # Base de datos persistente (SQLite) con las respuestas ya obtenidas del modelo.
+    _RESPUESTAS_DB = _ROOT / "llm_cache.sqlite3"
+    _MAX_RESPUESTAS_MEMORIA = 1024
+    # Número máximo de algoritmos que se envían en un mismo prompt por lotes.
+    _TAMANO_LOTE = 10
+    # Prefijo de las respuestas que informan de un fallo de la API (nunca se guardan en caché).
+    _PREFIJO_ERROR = "Error al contactar la API de Gemini"
+    # Separa la respuesta por lotes en los bloques '### PY i ###' de cada fragmento.
+    _BLOQUE_PY_RE = re.compile(r"^###\s*PY\s+(\d+)\s*###[ \t]*$", re.MULTILINE)
+    # Marcas de bloque Markdown (```python, ```json, ```) al inicio o al final de una línea.
+    _FENCE_RE = re.compile(r"^[ \t]*```[\w+-]*|```[ \t]*$", re.MULTILINE)
+    # Estados en los que un trabajo del modo por lotes ya no avanza, y segundos entre consultas.
+    _ESTADOS_FINALES_LOTE = frozenset({"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED",
+                                       "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"})
+    _INTERVALO_SONDEO_LOTE = 30
+    # Espera máxima de un trabajo por lotes: Gemini los resuelve en menos de 24 horas.
+    _TIMEOUT_LOTE = 24 * 3600
+    # Máximo de tokens de salida por rol. En los modelos 2.5 el razonamiento interno
+    # también cuenta, por eso incluso las respuestas cortas reservan cierto margen.
+    _LIMITES_ROL: Dict[str, int] = {
+        "traduccion": 8192,
+        "traduccion_lote": 32768,
+        "natural": 4096,
+        "validacion": 4096,
+        "clasificacion": 1024,
+        "clasificacion_lote": 4096,
+    }
+    # Roles que se resuelven con el modelo rápido; el resto usa el modelo principal.
+    _ROLES_RAPIDOS = frozenset({"natural", "clasificacion", "clasificacion_lote"})
+    # Roles cuya respuesta es una sola línea: se reciben en streaming y se corta al completarla.
+    _ROLES_UNA_LINEA = frozenset({"clasificacion"})
+    # Segundos máximos de cada intento y política de reintentos ante errores transitorios.
+    _TIMEOUT_PETICION = 120
+    _REINTENTOS = {"initial": 1.0, "maximum": 8.0, "multiplier": 2.0, "timeout": 300.0}
+    # Instrucción común a todos los roles. Va como 'system_instruction' del modelo y,
+    # junto con el libro, forma un prefijo idéntico en todas las peticiones que
+    # Gemini puede reutilizar de su caché implícita de prefijos. Por eso cada prompt
+    # coloca primero su parte fija y deja al final únicamente el contenido variable.
+    _INSTRUCCION_SISTEMA = ("Tu única fuente de verdad es el libro 'Introduction to Algorithms' "
+                            "(Cormen et al.) proporcionado como contexto al inicio de cada consulta.")
+
+    def __init__(self, modelo: str = "gemini-2.5-pro", modelo_rapido: str = "gemini-2.5-flash",
+                 rpm: int = 60, tpm: int = 1_000_000):
         """
         Inicializa el servicio LLM, configura la API y gestiona la carga
         del libro de contexto usando un sistema de caché.
+
+        Args:
+            modelo (str): Modelo principal, usado en las tareas de razonamiento.
+            modelo_rapido (str): Modelo de los roles en _ROLES_RAPIDOS.
+            rpm (int): Peticiones por minuto que el limitador de tasa deja pasar.
+            tpm (int): Tokens de entrada por minuto que el limitador de tasa deja pasar.
         """
         self._api_key = os.getenv("GOOGLE_API_KEY")
         if not self._api_key:
@@ -52,160 +244,684 @@ class LLMService:
         if not genai:
             raise RuntimeError("La librería 'google-generativeai' no está instalada.")
 
-        genai.configure(api_key=self._api_key)
-        self._modelo_genai = genai.GenerativeModel(modelo)
+        self._configurar_sdk(self._api_key)
+        self._modelo_genai = self._obtener_modelo(modelo, self._INSTRUCCION_SISTEMA)
         self._modelo = modelo
+        self._modelo_rapido_genai = self._obtener_modelo(modelo_rapido, self._INSTRUCCION_SISTEMA)
+        self._modelo_rapido = modelo_rapido
         self._analizador: Optional[Analizador] = None
+        # Caché LRU en memoria de respuestas, indexada por modelo y hash del prompt
+        self._cache_respuestas: OrderedDict[str, str] = OrderedDict()
+        self._cache_disco = PromptCache(self._RESPUESTAS_DB)
+        # Tokens del prompt servidos desde la caché de prefijos de Gemini
+        self._tokens_cacheados = 0
+        self._limitador = self._obtener_limitador(self._api_key, rpm, tpm)
+        # Llamadas asíncronas en curso, indexadas por la misma clave que la caché
+        self._en_curso: Dict[str, asyncio.Future] = {}
 
         # --- Gestión del Contexto Permanente con Caché ---
+        # SHA-256 del contenido del libro: forma parte de las claves de caché.
+        self._huella = self._huella_libro()
         self._libro_contexto_file = self._gestionar_cache_libro()
+        self._tokens_libro = self._contar_tokens_libro()
         # -----------------------------------------------
 
+    @classmethod
+    def _configurar_sdk(cls, api_key: str):
+        """
+        Configura el SDK solo la primera vez (o si cambia la API Key). Cada
+        llamada a genai.configure descarta los clientes creados hasta entonces,
+        y con ellos su canal gRPC y las conexiones ya establecidas; así todas las
+        instancias de LLMService del proceso comparten un mismo transporte.
+        """
+        if cls._API_KEY_CONFIGURADA != api_key:
+            genai.configure(api_key=api_key)
+            cls._API_KEY_CONFIGURADA = api_key
+            # Los modelos creados con la configuración anterior ya no son válidos.
+            cls._MODELOS.clear()
+
+    @classmethod
+    def _obtener_limitador(cls, api_key: str, rpm: int, tpm: int) -> AsyncTokenBucket:
+        """
+        Devuelve el limitador de tasa de 'api_key', creándolo la primera vez.
+        Todas las instancias que usan la misma clave comparten el limitador, ya
+        que comparten la cuota; rigen los límites de la primera que lo creó.
+        """
+        limitador = cls._LIMITADORES.get(api_key)
+        if limitador is None:
+            limitador = cls._LIMITADORES[api_key] = AsyncTokenBucket(rpm=rpm, tpm=tpm)
+        return limitador
+
+    @classmethod
+    def _obtener_modelo(cls, nombre: str, sistema: Optional[str] = None) -> genai.GenerativeModel:
+        """
+        Devuelve el GenerativeModel de 'nombre' con la instrucción de sistema
+        indicada, creándolo solo la primera vez: las instancias de LLMService
+        del mismo proceso comparten los modelos en lugar de reconstruirlos.
+        """
+        clave = (nombre, sistema)
+        modelo = cls._MODELOS.get(clave)
+        if modelo is None:
+            modelo = cls._MODELOS[clave] = genai.GenerativeModel(nombre, system_instruction=sistema)
+        return modelo
+
     def _gestionar_cache_libro(self) -> File:
         """
         Verifica si existe una referencia válida del libro en caché.
         Si no, sube el libro y guarda la nueva referencia en caché.
+        La referencia solo es válida si se subió el mismo archivo que hay ahora
+        en disco: si el PDF local cambia, se vuelve a subir aunque no hayan
+        pasado 48 horas.
         """
+        huella = self._huella
         cache_data = self._cargar_cache()
         if cache_data:
-            nombre_archivo = cache_data.get("file_name")
-            tiempo_carga_str = cache_data.get("upload_time")
-            if nombre_archivo and tiempo_carga_str:
-                tiempo_carga = datetime.fromisoformat(tiempo_carga_str)
+            nombre_archivo = cache_data["file_name"]
+            if nombre_archivo and cache_data.get("file_sha256") == huella:
+                tiempo_carga = datetime.fromisoformat(cache_data["upload_time"])
                 # Google almacena los archivos por 48 horas.
                 if datetime.now() - tiempo_carga < timedelta(hours=48):
+                    file_obj = self._ARCHIVOS_CONTEXTO.get(nombre_archivo)
+                    if file_obj is not None:
+                        return file_obj
                     try:
                         print(f"--- [LLMService] Intentando reutilizar archivo en caché: {nombre_archivo} ---")
                         file_obj = genai.get_file(name=nombre_archivo)
                         print(f"Éxito. Usando el libro '{file_obj.display_name}' desde la caché.")
+                        self._ARCHIVOS_CONTEXTO[nombre_archivo] = file_obj
                         return file_obj
                     except exceptions.NotFound:
                         print("--- [LLMService] El archivo en caché ya no existe en Google. Se subirá de nuevo. ---")
 
         # Si no hay caché válido, se sube el archivo
-        return self._subir_y_guardar_libro_en_cache()
+        return self._subir_y_guardar_libro_en_cache(huella)
+
+    def _contar_tokens_libro(self) -> int:
+        """
+        Tokens de entrada que el libro añade a cada petición. Se cuentan con
+        count_tokens una sola vez por proceso y por huella del PDF; si la API
+        falla se usa _TOKENS_LIBRO_ESTIMADOS.
+        """
+        tokens = self._TOKENS_LIBRO.get(self._huella)
+        if tokens is None:
+            try:
+                tokens = self._modelo_genai.count_tokens([self._libro_contexto_file]).total_tokens
+            except exceptions.GoogleAPIError:
+                tokens = self._TOKENS_LIBRO_ESTIMADOS
+            self._TOKENS_LIBRO[self._huella] = tokens
+        return tokens
+
+    def _huella_libro(self) -> str:
+        """
+        Comprueba, antes de cualquier subida, que el libro exista y no esté vacío,
+        y devuelve el SHA-256 de su contenido.
+
+        Raises:
+            FileNotFoundError: Si el libro no existe (o es un enlace roto).
+            ValueError: Si el archivo del libro está vacío.
+        """
+        try:
+            estado = self._RUTA_LIBRO.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No se encontró el libro en la ruta interna: {self._RUTA_LIBRO}") from None
+        if estado.st_size == 0:
+            raise ValueError(f"El libro de contexto está vacío: {self._RUTA_LIBRO}")
+        return self._sha256_archivo(str(self._RUTA_LIBRO), estado.st_mtime_ns, estado.st_size)
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _sha256_archivo(ruta: str, mtime_ns: int, tamano: int) -> str:
+        """
+        SHA-256 del archivo, memorizado por (ruta, fecha de modificación, tamaño):
+        crear otra instancia no vuelve a leer el PDF completo mientras no cambie
+        en disco. mtime_ns y tamano solo forman parte de la clave de la caché.
+        """
+        with open(ruta, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
 
     def _cargar_cache(self) -> Optional[dict]:
-        """Carga los datos del archivo de caché si existe."""
-        if self._CACHE_FILE.exists():
+        """
+        Carga los datos del archivo de caché si existe, es legible y tiene la
+        forma esperada: un objeto con 'file_name' y 'upload_time' (fecha ISO)
+        de tipo cadena. En cualquier otro caso devuelve None.
+        """
+        try:
             with self._CACHE_FILE.open('r') as f:
-                return json.load(f)
-        return None
+                cache_data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            # Un archivo dañado equivale a no tener caché: se vuelve a subir el libro.
+            return None
+
+        # Lo mismo si el JSON es válido pero no es la referencia que se guardó.
+        if not isinstance(cache_data, dict):
+            return None
+        nombre_archivo, tiempo_carga = cache_data.get("file_name"), cache_data.get("upload_time")
+        if not isinstance(nombre_archivo, str) or not isinstance(tiempo_carga, str):
+            return None
+        try:
+            datetime.fromisoformat(tiempo_carga)
+        except ValueError:
+            return None
+        return cache_data
 
-    def _subir_y_guardar_libro_en_cache(self) -> File:
-        """Sube el libro a la API de Google y guarda su referencia en el archivo de caché."""
+    def _subir_y_guardar_libro_en_cache(self, huella: str) -> File:
+        """
+        Sube el libro a la API de Google y guarda su referencia, junto con la
+        huella SHA-256 del archivo subido, en el archivo de caché.
+        """
         print("--- [LLMService] Subiendo el libro de contexto a la API de Archivos de Google... ---")
-        if not self._RUTA_LIBRO.exists():
-            raise FileNotFoundError(f"No se encontró el libro en la ruta interna: {self._RUTA_LIBRO}")
 
         file_obj = genai.upload_file(path=self._RUTA_LIBRO)
         print(f"Libro '{file_obj.display_name}' subido con éxito.")
+        self._ARCHIVOS_CONTEXTO[file_obj.name] = file_obj
 
         cache_data = {
             "file_name": file_obj.name,
-            "upload_time": datetime.now().isoformat()
+            "upload_time": datetime.now().isoformat(),
+            "file_sha256": huella
         }
-        with open(self._CACHE_FILE, 'w') as f:
-            json.dump(cache_data, f)
+        # Se escribe en un temporal del mismo directorio y se sustituye de forma
+        # atómica, para que una interrupción no deje el archivo truncado.
+        f = tempfile.NamedTemporaryFile('w', dir=self._CACHE_FILE.parent, suffix='.tmp', delete=False)
+        try:
+            with f:
+                json.dump(cache_data, f)
+            os.replace(f.name, self._CACHE_FILE)
+        except BaseException:
+            # Con delete=False el temporal no se borra solo si la escritura falla.
+            os.unlink(f.name)
+            raise
         print(f"--- [LLMService] Referencia guardada en '{self._CACHE_FILE}'. ---")
         return file_obj
 
     # --- Propiedades y Setters (sin cambios) ---
+    @property
+    def tokens_cacheados(self) -> int:
+        """Tokens de entrada que Gemini sirvió desde su caché de prefijos en esta sesión."""
+        return self._tokens_cacheados
+
     @property
     def modelo(self) -> str:
         return self._modelo
 
+    @property
+    def modelo_rapido(self) -> str:
+        return self._modelo_rapido
+
     # ... (resto de propiedades) ...
 
     # --- Métodos de Lógica de Negocio ---
-    def _ejecutar_prompt_con_contexto(self, prompt: str) -> str:
-        """Función auxiliar que siempre incluye el libro como contexto."""
+    def _clave(self, *partes: str, modelo: Optional[str] = None) -> str:
+        """
+        Clave de caché: SHA-256 del modelo (el principal si no se indica), de la
+        huella del contenido del libro de contexto y de las partes indicadas.
+        Cambiar de modelo o modificar el PDF invalida las respuestas previas.
+        """
+        cabecera = (modelo or self._modelo, self._huella)
+        return hashlib.sha256("\x1f".join(cabecera + partes).encode()).hexdigest()
+
+    def _clave_prompt(self, prompt: str, modelo: Optional[str] = None) -> str:
+        """Clave de caché de la respuesta de 'modelo' a un prompt."""
+        return self._clave(prompt, modelo=modelo)
+
+    def _modelo_para(self, rol: str) -> Tuple[str, genai.GenerativeModel]:
+        """Devuelve el nombre y la instancia del modelo que atiende el rol indicado."""
+        if rol in self._ROLES_RAPIDOS:
+            return self._modelo_rapido, self._modelo_rapido_genai
+        return self._modelo, self._modelo_genai
+
+    def _clave_traduccion(self, pseudocodigo: str) -> str:
+        """
+        Clave de caché de la traducción a Python de un pseudocódigo: depende del
+        modelo de traducción, de las plantillas de traducción y del texto del
+        pseudocódigo, pero no de la forma del prompt, por lo que la comparten
+        las traducciones individuales y las hechas por lotes.
+        """
+        modelo, _ = self._modelo_para("traduccion")
+        return self._clave("py", _HUELLA_TRADUCCION, pseudocodigo, modelo=modelo)
+
+    def _buscar_en_cache(self, clave: str) -> Optional[str]:
+        """Busca una respuesta previa, primero en memoria y luego en disco."""
+        respuesta = self._cache_respuestas.get(clave)
+        if respuesta is not None:
+            self._cache_respuestas.move_to_end(clave)
+            return respuesta
+
+        respuesta = self._cache_disco.get(clave)
+        if respuesta is not None:
+            self._recordar_respuesta(clave, respuesta)
+        return respuesta
+
+    def _recordar_respuesta(self, clave: str, respuesta: str):
+        """Guarda una respuesta en la caché LRU en memoria."""
+        self._cache_respuestas[clave] = respuesta
+        if len(self._cache_respuestas) > self._MAX_RESPUESTAS_MEMORIA:
+            self._cache_respuestas.popitem(last=False)
+
+    def _guardar_en_cache(self, clave: str, respuesta: str):
+        """Guarda una respuesta nueva en memoria y en disco."""
+        self._cache_disco.put(clave, respuesta)
+        self._recordar_respuesta(clave, respuesta)
+
+    def _opciones_peticion(self, rol: str, asincrona: bool = False) -> dict:
+        """
+        Argumentos de generate_content que acotan una petición: el máximo de
+        tokens de salida del rol, el timeout de cada intento y los reintentos.
+        """
+        reintentos = (api_retry_async.AsyncRetry if asincrona else api_retry.Retry)(**self._REINTENTOS)
+        return {
+            "generation_config": {"max_output_tokens": self._LIMITES_ROL[rol]},
+            "request_options": {"timeout": self._TIMEOUT_PETICION, "retry": reintentos},
+        }
+
+    @staticmethod
+    def _tokens_estimados(prompt: str) -> int:
+        """Estimación de los tokens del texto de un prompt, a ~4 caracteres por token."""
+        return len(prompt) // 4
+
+    def _tokens_peticion(self, prompt: str) -> int:
+        """
+        Tokens de entrada con los que una petición cuenta para la cuota TPM:
+        el prompt más el libro, que va en todas las peticiones y cuenta aunque
+        Gemini lo sirva desde su caché de prefijos.
+        """
+        return self._tokens_estimados(prompt) + self._tokens_libro
+
+    def _ejecutar_prompt_con_contexto(self, prompt: str, rol: str, cachear: bool = True) -> str:
+        """
+        Función auxiliar que siempre incluye el libro como contexto.
+        Las respuestas se guardan en memoria y en disco, de modo que repetir un
+        prompt (también entre ejecuciones) no vuelve a llamar a la API.
+        'rol' selecciona el modelo (ver _modelo_para) y el límite de tokens
+        de salida en _LIMITES_ROL. Con cachear=False la respuesta ni se busca
+        ni se guarda por su prompt: las traducciones guardan solo el código ya
+        limpio, con su propia clave (ver _clave_traduccion).
+        """
+        nombre_modelo, modelo_genai = self._modelo_para(rol)
+        clave = self._clave_prompt(prompt, nombre_modelo)
+        if cachear:
+            respuesta = self._buscar_en_cache(clave)
+            if respuesta is not None:
+                return respuesta
+
+        self._limitador.acquire_sync(self._tokens_peticion(prompt))
+        try:
+            if rol in self._ROLES_UNA_LINEA:
+                resultado = modelo_genai.generate_content([self._libro_contexto_file, prompt], stream=True,
+                                                          **self._opciones_peticion(rol))
+                respuesta = self._leer_primera_linea(resultado)
+            else:
+                resultado = modelo_genai.generate_content([self._libro_contexto_file, prompt],
+                                                          **self._opciones_peticion(rol))
+                respuesta = resultado.text.strip()
+        except Exception as e:
+            # Los errores no se guardan en caché para poder reintentar.
+            return f"{self._PREFIJO_ERROR}: {e}"
+        self._registrar_uso(resultado)
+        if cachear:
+            self._guardar_en_cache(clave, respuesta)
+        return respuesta
+
+    @staticmethod
+    def _primera_linea(texto: str) -> Optional[str]:
+        """Primera línea no vacía de 'texto' si ya terminó con un salto de línea; None si aún está incompleta."""
+        linea, salto, _ = texto.lstrip().partition("\n")
+        return linea.strip() if salto else None
+
+    @classmethod
+    def _leer_primera_linea(cls, respuesta_stream) -> str:
+        """
+        Consume una respuesta en streaming solo hasta completar su primera línea;
+        el resto de la respuesta (explicaciones que el modelo añada pese a las
+        instrucciones) ya no se espera.
+        """
+        texto = ""
+        for fragmento in respuesta_stream:
+            if fragmento.parts:
+                texto += fragmento.text
+            linea = cls._primera_linea(texto)
+            if linea is not None:
+                return linea
+        return texto.strip()
+
+    @classmethod
+    async def _leer_primera_linea_async(cls, respuesta_stream) -> str:
+        """Versión asíncrona de _leer_primera_linea."""
+        texto = ""
+        async for fragmento in respuesta_stream:
+            if fragmento.parts:
+                texto += fragmento.text
+            linea = cls._primera_linea(texto)
+            if linea is not None:
+                return linea
+        return texto.strip()
+
+    def _registrar_uso(self, resultado):
+        """Acumula los tokens que la respuesta indica como servidos desde la caché de prefijos."""
+        uso = getattr(resultado, "usage_metadata", None)
+        self._tokens_cacheados += getattr(uso, "cached_content_token_count", 0) or 0
+
+    async def _ejecutar_prompt_con_contexto_async(self, prompt: str, rol: str, cachear: bool = True) -> str:
+        """
+        Versión asíncrona de _ejecutar_prompt_con_contexto. No bloquea durante
+        la llamada a la API, por lo que varios prompts pueden estar en curso a
+        la vez sobre el mismo cliente (y el mismo pool de conexiones) del SDK;
+        el limitador de tasa las espacia para no superar la cuota de la API.
+        Los prompts idénticos que coinciden en el tiempo comparten una única llamada.
+        """
+        nombre_modelo, modelo_genai = self._modelo_para(rol)
+        clave = self._clave_prompt(prompt, nombre_modelo)
+        if cachear:
+            respuesta = self._buscar_en_cache(clave)
+            if respuesta is not None:
+                return respuesta
+
+        # Si el mismo prompt ya está en curso, se espera su respuesta en lugar de repetir la llamada.
+        tarea = self._en_curso.get(clave)
+        if tarea is None:
+            tarea = asyncio.ensure_future(self._consultar_api_async(prompt, rol, modelo_genai,
+                                                                    clave if cachear else None))
+            self._en_curso[clave] = tarea
+            tarea.add_done_callback(lambda _: self._en_curso.pop(clave, None))
+        # shield: si se cancela a uno de los que esperan, la llamada compartida sigue en curso.
+        return await asyncio.shield(tarea)
+
+    async def _consultar_api_async(self, prompt: str, rol: str, modelo_genai: genai.GenerativeModel,
+                                   clave: Optional[str]) -> str:
+        """Realiza la llamada asíncrona a la API y, si se indica una clave, guarda en caché la respuesta."""
+        await self._limitador.acquire(self._tokens_peticion(prompt))
         try:
-            respuesta = self._modelo_genai.generate_content([self._libro_contexto_file, prompt])
-            return respuesta.text.strip()
+            if rol in self._ROLES_UNA_LINEA:
+                resultado = await modelo_genai.generate_content_async([self._libro_contexto_file, prompt],
+                                                                      stream=True,
+                                                                      **self._opciones_peticion(rol, asincrona=True))
+                respuesta = await self._leer_primera_linea_async(resultado)
+            else:
+                resultado = await modelo_genai.generate_content_async([self._libro_contexto_file, prompt],
+                                                                      **self._opciones_peticion(rol, asincrona=True))
+                respuesta = resultado.text.strip()
         except Exception as e:
-            return f"Error al contactar la API de Gemini: {e}"
+            # Los errores no se guardan en caché para poder reintentar.
+            return f"{self._PREFIJO_ERROR}: {e}"
+        self._registrar_uso(resultado)
+        if clave is not None:
+            self._guardar_en_cache(clave, respuesta)
+        return respuesta
+
+    @staticmethod
+    def _prompt_traduccion_python(pseudocodigo: str) -> str:
+        """Construye el prompt de traducción de pseudocódigo a Python."""
+        return _TPL_TRADUCCION_PY.format(pseudocodigo=pseudocodigo)
+
+    @classmethod
+    def _limpiar_codigo(cls, codigo_generado: str) -> str:
+        """Elimina las marcas de bloque de código Markdown de la respuesta."""
+        return cls._FENCE_RE.sub("", codigo_generado).strip()
+
+    def _guardar_traduccion(self, pseudocodigo: str, codigo: str):
+        """Guarda una traducción válida en la caché de traducciones."""
+        if codigo and not codigo.startswith(self._PREFIJO_ERROR):
+            self._guardar_en_cache(self._clave_traduccion(pseudocodigo), codigo)
 
     def traducir_pseudocodigo_a_python(self, pseudocodigo: str) -> str:
         """Usa el LLM para convertir pseudocódigo a Python, basándose en el libro."""
-        prompt = f"""
-                    Actúa como un programador experto en algoritmos científico de la computación, especializado en traducir pseudocódigo del libro 'Introduction to Algorithms' de Cormen a Python idiomático.
-                            
-                    **Contexto Académico:** Tu única fuente de verdad es el libro 'Introduction to Algorithms' proporcionado. 
-
-                    **Tarea:** Basado en las convenciones del libro, traduce el siguiente pseudocódigo a una función de Python.
-
-                    **Reglas Estrictas:**
-                    1.  **Salida Exclusiva de Código:** Responde **únicamente con el código Python**.
-                    2.  **Fidelidad al Libro:** Traduce `←` se convierte en `=`, `A.length` a `len(A)`, `≤, ≥, ≠` en `<=, >=, !=` y adapta los bucles de 1-indexado a 0-indexado.
-                    3.  **Manejo de índices:** Adapta los bucles y accesos de 1-indexado (Cormen) a 0-indexado (Python).
-
-                    **Pseudocódigo a Traducir:**
-                    ---
-                    {pseudocodigo}
-                    ---
-                    """
-        codigo_generado = self._ejecutar_prompt_con_contexto(prompt)
-        return codigo_generado.replace("```python", "").replace("```", "").strip()
+        codigo = self._buscar_en_cache(self._clave_traduccion(pseudocodigo))
+        if codigo is None:
+            prompt = self._prompt_traduccion_python(pseudocodigo)
+            codigo = self._limpiar_codigo(self._ejecutar_prompt_con_contexto(prompt, "traduccion", cachear=False))
+            self._guardar_traduccion(pseudocodigo, codigo)
+        return codigo
+
+    async def traducir_pseudocodigo_a_python_async(self, pseudocodigo: str) -> str:
+        """Versión asíncrona de traducir_pseudocodigo_a_python."""
+        codigo = self._buscar_en_cache(self._clave_traduccion(pseudocodigo))
+        if codigo is None:
+            prompt = self._prompt_traduccion_python(pseudocodigo)
+            codigo = self._limpiar_codigo(await self._ejecutar_prompt_con_contexto_async(prompt, "traduccion",
+                                                                                         cachear=False))
+            self._guardar_traduccion(pseudocodigo, codigo)
+        return codigo
+
+    def traducir_batch(self, pseudocodigos: List[str]) -> List[str]:
+        """
+        Traduce varios pseudocódigos a Python enviando hasta _TAMANO_LOTE
+        fragmentos por prompt, en lugar de una llamada a la API por fragmento.
+        Cada fragmento va delimitado por '### SNIPPET i ###' y el modelo debe
+        responder con bloques '### PY i ###'. Los fragmentos cuya traducción
+        no aparece en la respuesta se traducen de forma individual, y los que
+        ya estaban traducidos en caché no se vuelven a enviar.
+        """
+        traducciones: List[Optional[str]] = [
+            self._buscar_en_cache(self._clave_traduccion(pseudo)) for pseudo in pseudocodigos
+        ]
+        pendientes = [i for i, codigo in enumerate(traducciones) if codigo is None]
+        for inicio in range(0, len(pendientes), self._TAMANO_LOTE):
+            indices = pendientes[inicio:inicio + self._TAMANO_LOTE]
+            lote = [pseudocodigos[i] for i in indices]
+            fragmentos = "\n".join(f"### SNIPPET {i} ###\n{pseudo}" for i, pseudo in enumerate(lote))
+            prompt = _TPL_TRADUCCION_PY_LOTE.format(fragmentos=fragmentos)
+            respuesta = self._ejecutar_prompt_con_contexto(prompt, "traduccion_lote", cachear=False)
+
+            # re.split con un grupo devuelve [prefijo, i0, bloque0, i1, bloque1, ...]
+            partes = self._BLOQUE_PY_RE.split(respuesta)
+            bloques = {int(indice): self._limpiar_codigo(codigo) for indice, codigo in zip(partes[1::2], partes[2::2])}
+            for j, (i, pseudo) in enumerate(zip(indices, lote)):
+                codigo = bloques.get(j)
+                if codigo:
+                    self._guardar_traduccion(pseudo, codigo)
+                else:
+                    codigo = self.traducir_pseudocodigo_a_python(pseudo)
+                traducciones[i] = codigo
+        return traducciones
+
+    @staticmethod
+    def _prompt_natural_a_pseudocodigo(texto: str) -> str:
+        """Construye el prompt de conversión de lenguaje natural a pseudocódigo."""
+        return _TPL_NATURAL_A_PSEUDOCODIGO.format(texto=texto)
 
     def traducir_natural_a_pseudocodigo(self, texto: str) -> str:
         """Usa el LLM para convertir lenguaje natural a pseudocódigo estilo Cormen."""
-        prompt = f"""
-                    Actúa como un experto en el libro 'Introduction to Algorithms' de Cormen.
-                    
-                    **Contexto Académico:** Tu única fuente de verdad es el libro 'Introduction to Algorithms' proporcionado. 
-
-                    **Tarea:** Convierte la siguiente descripción a pseudocódigo, siguiendo estrictamente el estilo del libro. Convierte la siguiente descripción en lenguaje natural a pseudocódigo, siguiendo estrictamente el estilo de Cormen.
-
-                    **Reglas de Estilo del Libro:**
-                    - Usa `←` para asignaciones.
-                    - Usa `A.length` para la longitud de arreglos.
-                    - Usa bucles `for`, `while` con la sintaxis del libro.
-                    - Usa comentarios con `//`.
-
-                    **Descripción a Convertir que viene en lenguaje Natural:**
-                    "{texto}"
-                    """
-        return self._ejecutar_prompt_con_contexto(prompt)
+        return self._ejecutar_prompt_con_contexto(self._prompt_natural_a_pseudocodigo(texto), "natural")
+
+    async def traducir_natural_a_pseudocodigo_async(self, texto: str) -> str:
+        """Versión asíncrona de traducir_natural_a_pseudocodigo."""
+        return await self._ejecutar_prompt_con_contexto_async(self._prompt_natural_a_pseudocodigo(texto), "natural")
+
+    @staticmethod
+    def _prompt_validacion(complejidad: Complejidad, pseudocodigo: str) -> str:
+        """Construye el prompt de validación de un análisis de complejidad."""
+        return _TPL_VALIDACION.format(
+            notacion_o=complejidad.notacion_o,
+            notacion_omega=complejidad.notacion_omega,
+            justificacion=complejidad.justificacion_matematica,
+            pseudocodigo=pseudocodigo,
+        )
 
     def validar_analisis(self, complejidad: Complejidad, pseudocodigo: str) -> str:
         """Pide al LLM que valide un análisis de complejidad, usando el libro como referencia."""
-        prompt = f"""
-                Actúa como un experto en análisis de algoritmos, al nivel de un profesor de ciencias de la computación.
-                
-                **Contexto Académico:** Tu única fuente de verdad es el libro 'Introduction to Algorithms' proporcionado.
+        return self._ejecutar_prompt_con_contexto(self._prompt_validacion(complejidad, pseudocodigo), "validacion")
+
+    async def validar_analisis_async(self, complejidad: Complejidad, pseudocodigo: str) -> str:
+        """Versión asíncrona de validar_analisis."""
+        return await self._ejecutar_prompt_con_contexto_async(self._prompt_validacion(complejidad, pseudocodigo),
+                                                            "validacion")
 
-                **Tarea:** Como un profesor de algoritmos, revisa y valida el siguiente análisis de complejidad basándote en la teoría del libro.
+    @staticmethod
+    def _prompt_clasificacion(algoritmo: Algoritmo) -> str:
+        """Construye el prompt de clasificación del patrón de diseño de un algoritmo."""
+        return _TPL_CLASIFICACION.format(codigo=algoritmo.codigo_fuente)
 
-                **Pseudocódigo:**
-                {pseudocodigo}
+    def clasificar_patron(self, algoritmo: Algoritmo) -> str:
+        """Usa el LLM para identificar el patrón de diseño del algoritmo, según las definiciones del libro."""
+        return self._ejecutar_prompt_con_contexto(self._prompt_clasificacion(algoritmo), "clasificacion")
 
+    async def clasificar_patron_async(self, algoritmo: Algoritmo) -> str:
+        """Versión asíncrona de clasificar_patron."""
+        return await self._ejecutar_prompt_con_contexto_async(self._prompt_clasificacion(algoritmo), "clasificacion")
 
-                **Análisis Propuesto:**
-                - O(n): {complejidad.notacion_o}
-                - Ω(n): {complejidad.notacion_omega}
-                - Justificación: {complejidad.justificacion_matematica}
+    def clasificar_patrones_batch(self, algoritmos: List[Algoritmo]) -> List[str]:
+        """
+        Clasifica el patrón de diseño de varios algoritmos agrupándolos en un
+        único prompt por cada lote de hasta _TAMANO_LOTE algoritmos, en lugar de
+        hacer una llamada a la API por algoritmo.
+        """
+        patrones: List[str] = []
+        for inicio in range(0, len(algoritmos), self._TAMANO_LOTE):
+            lote = algoritmos[inicio:inicio + self._TAMANO_LOTE]
+            bloques = "\n".join(
+                f"### ALGORITMO {i} ###\n{algoritmo.codigo_fuente}" for i, algoritmo in enumerate(lote)
+            )
+            prompt = _TPL_CLASIFICACION_LOTE.format(bloques=bloques)
+            respuesta = self._ejecutar_prompt_con_contexto(prompt, "clasificacion_lote")
+            try:
+                resultado = json.loads(self._limpiar_codigo(respuesta))
+            except json.JSONDecodeError:
+                resultado = None
+
+            if isinstance(resultado, list) and len(resultado) == len(lote):
+                patrones.extend(str(patron).strip() for patron in resultado)
+            else:
+                # Si la respuesta no respeta el formato, se clasifica uno a uno.
+                patrones.extend(self.clasificar_patron(algoritmo) for algoritmo in lote)
+        return patrones
+
+    # --- Modo por lotes (Batch API de Gemini) ---
+    def _cliente_lotes(self):
+        """Crea el cliente del SDK 'google-genai' usado por el modo por lotes."""
+        if genai_lotes is None:
+            raise RuntimeError("El modo por lotes requiere la librería 'google-genai' (pip install google-genai).")
+        return genai_lotes.Client(api_key=self._api_key)
+
+    def submit_batch(self, prompts: List[str], rol: str) -> str:
+        """
+        Envía los prompts, cada uno con el libro como contexto, como un único
+        trabajo del modo por lotes de Gemini: cuesta la mitad que las llamadas
+        individuales y no consume el límite de peticiones por minuto, a cambio
+        de una respuesta diferida. Como en las llamadas individuales, 'rol'
+        elige el modelo y el máximo de tokens de salida. Devuelve el nombre del trabajo.
+        """
+        cliente = self._cliente_lotes()
+        nombre_modelo, _ = self._modelo_para(rol)
+        libro = {"file_data": {"file_uri": self._libro_contexto_file.uri,
+                               "mime_type": self._libro_contexto_file.mime_type}}
+        sistema = {"parts": [{"text": self._INSTRUCCION_SISTEMA}]}
+        configuracion = {"max_output_tokens": self._LIMITES_ROL[rol]}
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False, encoding='utf-8') as f:
+            for i, prompt in enumerate(prompts):
+                peticion = {"system_instruction": sistema,
+                            "contents": [{"role": "user", "parts": [libro, {"text": prompt}]}],
+                            "generation_config": configuracion}
+                f.write(json.dumps({"key": f"req_{i}", "request": peticion}, ensure_ascii=False) + "\n")
+            ruta = f.name
+        try:
+            archivo = cliente.files.upload(file=ruta, config={"display_name": "efficode-lote", "mime_type": "jsonl"})
+        finally:
+            os.remove(ruta)
 
-                **Tu Respuesta:** Proporciona una segunda opinión experta y concisa. Confirma si es correcto o explica claramente cualquier error o matiz, citando conceptos del libro si es relevante.
-                """
-        return self._ejecutar_prompt_con_contexto(prompt)
+        trabajo = cliente.batches.create(model=nombre_modelo, src=archivo.name,
+                                         config={"display_name": "efficode-lote"})
+        print(f"--- [LLMService] Trabajo por lotes creado: {trabajo.name} ({len(prompts)} prompts) ---")
+        return trabajo.name
 
-    def clasificar_patron(self, algoritmo: Algoritmo) -> str:
-        """Usa el LLM para identificar el patrón de diseño del algoritmo, según las definiciones del libro."""
-        prompt = f"""
-                Actúa como un científico de la computación experto en paradigmas de diseño de algoritmos.
-        
-                **Contexto Académico:** Tu única fuente de verdad es el libro 'Introduction to Algorithms' proporcionado.
+    def poll_batch(self, nombre_trabajo: str, timeout: Optional[float] = None) -> Dict[str, str]:
+        """
+        Espera a que termine el trabajo por lotes y descarga sus resultados.
+        Devuelve el texto de cada respuesta indexado por la clave de su petición
+        ('req_i'); las peticiones fallidas devuelven un mensaje de error.
 
-                **Tarea:** Identifica el principal paradigma de diseño algorítmico del pseudocódigo, usando la terminología del libro.
+        Args:
+            nombre_trabajo (str): Nombre devuelto por submit_batch.
+            timeout (float): Segundos máximos de espera (por defecto _TIMEOUT_LOTE).
 
-                **Pseudocódigo:**
-                {algoritmo.codigo_fuente}
+        Raises:
+            ConnectionError: Si el trabajo termina sin éxito.
+            TimeoutError: Si el trabajo no termina dentro del plazo.
+        """
+        cliente = self._cliente_lotes()
+        limite = time.monotonic() + (self._TIMEOUT_LOTE if timeout is None else timeout)
+        trabajo = cliente.batches.get(name=nombre_trabajo)
+        while trabajo.state.name not in self._ESTADOS_FINALES_LOTE:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                raise TimeoutError(f"El trabajo por lotes {nombre_trabajo} no terminó a tiempo "
+                                   f"(último estado: {trabajo.state.name}).")
+            time.sleep(min(self._INTERVALO_SONDEO_LOTE, restante))
+            trabajo = cliente.batches.get(name=nombre_trabajo)
+        if trabajo.state.name != "JOB_STATE_SUCCEEDED":
+            raise ConnectionError(f"El trabajo por lotes {nombre_trabajo} terminó con estado {trabajo.state.name}.")
+
+        contenido = cliente.files.download(file=trabajo.dest.file_name).decode('utf-8')
+        resultados: Dict[str, str] = {}
+        for linea in contenido.splitlines():
+            if not linea.strip():
+                continue
+            resultado = json.loads(linea)
+            try:
+                partes = resultado["response"]["candidates"][0]["content"]["parts"]
+                resultados[resultado["key"]] = "".join(parte.get("text", "") for parte in partes).strip()
+            except (KeyError, IndexError, TypeError):
+                resultados[resultado["key"]] = f"{self._PREFIJO_ERROR}: {resultado.get('error', 'respuesta vacía')}"
+        return resultados
+
+    def ejecutar_prompts_en_lote(self, prompts: List[str], rol: str) -> List[str]:
+        """
+        Obtiene la respuesta a varios prompts de un mismo rol con un único
+        trabajo por lotes. Los prompts ya respondidos se sirven desde la caché
+        (la misma, con las mismas claves, que usan las llamadas individuales
+        del rol) y solo se envían los restantes.
+        """
+        return self._ejecutar_grupos_en_lote([(prompts, rol)])[0]
 
+    def _ejecutar_grupos_en_lote(self, grupos: List[Tuple[List[str], str]]) -> List[List[str]]:
+        """
+        Resuelve varios grupos (prompts, rol) con un trabajo por lotes por grupo,
+        ya que cada trabajo se ejecuta sobre un único modelo. Todos los trabajos
+        se envían antes de esperar a ninguno, para que avancen a la vez.
+        """
+        respuestas_grupos: List[List[Optional[str]]] = []
+        enviados = []
+        for prompts, rol in grupos:
+            nombre_modelo, _ = self._modelo_para(rol)
+            claves = [self._clave_prompt(prompt, nombre_modelo) for prompt in prompts]
+            respuestas = [self._buscar_en_cache(clave) for clave in claves]
+            pendientes = [i for i, respuesta in enumerate(respuestas) if respuesta is None]
+            if pendientes:
+                trabajo = self.submit_batch([prompts[i] for i in pendientes], rol)
+                enviados.append((trabajo, rol, claves, pendientes, respuestas))
+            respuestas_grupos.append(respuestas)
+
+        for trabajo, rol, claves, pendientes, respuestas in enviados:
+            resultados = self.poll_batch(trabajo)
+            for j, i in enumerate(pendientes):
+                respuesta = resultados.get(f"req_{j}", f"{self._PREFIJO_ERROR}: sin respuesta en el trabajo por lotes")
+                if not respuesta.startswith(self._PREFIJO_ERROR):
+                    respuesta = self._ajustar_respuesta(respuesta, rol)
+                    self._guardar_en_cache(claves[i], respuesta)
+                respuestas[i] = respuesta
+        return respuestas_grupos
+
+    @classmethod
+    def _ajustar_respuesta(cls, texto: str, rol: str) -> str:
+        """
+        Da a una respuesta completa la misma forma que la llamada individual del
+        rol: de los roles en _ROLES_UNA_LINEA solo se conserva la primera línea.
+        """
+        if rol in cls._ROLES_UNA_LINEA:
+            return cls._primera_linea(texto + "\n")
+        return texto.strip()
 
-                **Instrucciones:** Responde únicamente con el nombre del patrón (ej: 'Divide and conquer', 'Dynamic programming', 'Greedy algorithm').
-                 Responde únicamente con el nombre del patrón. Sé específico.
-                 Ejemplos: 'Divide y Vencerás', 'Programación Dinámica', 'Algoritmo Voraz', 'Búsqueda por Fuerza Bruta', 'Backtracking'.
-                 Si no identificas un patrón claro, responde 'No se identifica un patrón estándar'.
-                """
-        return self._ejecutar_prompt_con_contexto(prompt)
+    def validar_y_clasificar_en_lote(self, analisis: List[Tuple[Complejidad, Algoritmo]]) -> List[Tuple[str, str]]:
+        """
+        Valida el análisis y clasifica el patrón de varios algoritmos en modo por
+        lotes: un trabajo de validación con el modelo principal y otro de
+        clasificación con el modelo rápido, ambos en curso a la vez. Devuelve
+        (validación, patrón) por algoritmo.
+        """
+        validaciones, patrones = self._ejecutar_grupos_en_lote([
+            ([self._prompt_validacion(complejidad, algoritmo.codigo_fuente) for complejidad, algoritmo in analisis],
+             "validacion"),
+            ([self._prompt_clasificacion(algoritmo) for _, algoritmo in analisis], "clasificacion"),
+        ])
+        return list(zip(validaciones, patrones))
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+
+
+class PromptCache:
+    """
+    Caché persistente de respuestas del LLM respaldada por SQLite.
+
+    Cada respuesta se guarda comprimida junto con la marca de tiempo de su
+    escritura; las entradas más antiguas que el TTL se consideran caducadas y
+    se eliminan al consultarlas. SQLite garantiza escrituras atómicas, por lo
+    que varias ejecuciones pueden compartir el mismo archivo.
+
+    La caché no interpreta las claves: quien la usa debe construirlas de modo
+    que identifiquen todo lo que determina la respuesta, incluidos el modelo y
+    la huella del contenido del libro de contexto (ver LLMService._clave).
+    """
+    __slots__ = ('_ruta', '_ttl', '_conexion', '_lock')
+
+    _ESQUEMA = "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, ts INTEGER NOT NULL)"
+
+    def __init__(self, ruta: Path, ttl: timedelta = timedelta(days=30)):
+        """
+        Args:
+            ruta (Path): Archivo de la base de datos; se crea si no existe.
+            ttl (timedelta): Tiempo durante el que una respuesta sigue siendo válida.
+        """
+        self._ruta = Path(ruta)
+        self._ttl = ttl
+        # Una sola conexión por instancia, abierta en el primer uso. Puede usarse
+        # desde varios hilos porque todo acceso pasa por el lock.
+        self._conexion: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ruta(self) -> Path:
+        return self._ruta
+
+    def _conectar(self) -> sqlite3.Connection:
+        """Devuelve la conexión de la instancia, abriéndola la primera vez. Requiere el lock."""
+        if self._conexion is None:
+            conexion = sqlite3.connect(self._ruta, timeout=10, check_same_thread=False)
+            conexion.execute(self._ESQUEMA)
+            self._conexion = conexion
+        return self._conexion
+
+    def get(self, clave: str) -> Optional[str]:
+        """Devuelve la respuesta guardada para 'clave', o None si no existe o ha caducado."""
+        with self._lock:
+            conexion = self._conectar()
+            fila = conexion.execute("SELECT value, ts FROM cache WHERE key = ?", (clave,)).fetchone()
+            if fila is None:
+                return None
+            valor, ts = fila
+            if time.time() - ts > self._ttl.total_seconds():
+                with conexion:
+                    conexion.execute("DELETE FROM cache WHERE key = ?", (clave,))
+                return None
+        return zlib.decompress(valor).decode()
+
+    def put(self, clave: str, valor: str):
+        """Guarda (o reemplaza) la respuesta asociada a 'clave'."""
+        with self._lock:
+            conexion = self._conectar()
+            with conexion:
+                conexion.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, ts) VALUES (?, ?, ?)",
+                    (clave, zlib.compress(valor.encode()), int(time.time()))
+                )
+
+    def close(self):
+        """Cierra la conexión; se reabrirá si la caché vuelve a usarse."""
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
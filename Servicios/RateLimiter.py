@@ -0,0 +1,77 @@
+from __future__ import annotations
+import asyncio
+import threading
+import time
+
+
+class AsyncTokenBucket:
+    """
+    Limitador de tasa del lado del cliente con dos cubetas de tokens: una de
+    peticiones por minuto (rpm) y otra de tokens por minuto (tpm).
+
+    Las cubetas se rellenan de forma continua según el tiempo transcurrido, sin
+    tareas en segundo plano, y cada petición espera hasta que ambas tengan saldo
+    suficiente. Así el ritmo de envío se mantiene bajo la cuota de la API en vez
+    de alternar ráfagas de peticiones con rachas de errores 429.
+    """
+    __slots__ = ('_rpm', '_tpm', '_peticiones', '_tokens', '_ultimo', '_lock')
+
+    def __init__(self, rpm: int, tpm: int):
+        """
+        Args:
+            rpm (int): Peticiones permitidas por minuto.
+            tpm (int): Tokens de entrada permitidos por minuto.
+        """
+        self._rpm = rpm
+        self._tpm = tpm
+        # Ambas cubetas empiezan llenas: se admite una ráfaga inicial de hasta un minuto de cuota.
+        self._peticiones = float(rpm)
+        self._tokens = float(tpm)
+        self._ultimo = time.monotonic()
+        # Protege el saldo frente a llamadas síncronas desde varios hilos.
+        self._lock = threading.Lock()
+
+    @property
+    def rpm(self) -> int:
+        return self._rpm
+
+    @property
+    def tpm(self) -> int:
+        return self._tpm
+
+    def _reservar(self, tokens: int) -> float:
+        """
+        Rellena las cubetas con el tiempo transcurrido y, si hay saldo, descuenta
+        la petición y devuelve 0. Si no lo hay, devuelve los segundos que faltan
+        para que lo haya, sin descontar nada.
+        """
+        # Una petición mayor que la cubeta completa nunca cabría; se limita a su capacidad.
+        tokens = min(tokens, self._tpm)
+        with self._lock:
+            ahora = time.monotonic()
+            transcurrido = ahora - self._ultimo
+            self._ultimo = ahora
+            self._peticiones = min(self._rpm, self._peticiones + transcurrido * self._rpm / 60)
+            self._tokens = min(self._tpm, self._tokens + transcurrido * self._tpm / 60)
+
+            espera = max((1 - self._peticiones) * 60 / self._rpm,
+                         (tokens - self._tokens) * 60 / self._tpm)
+            if espera <= 0:
+                self._peticiones -= 1
+                self._tokens -= tokens
+                return 0.0
+            return espera
+
+    async def acquire(self, estimated_tokens: int = 0):
+        """Espera, sin bloquear el bucle de eventos, hasta poder enviar una petición de 'estimated_tokens' tokens."""
+        espera = self._reservar(estimated_tokens)
+        while espera > 0:
+            await asyncio.sleep(espera)
+            espera = self._reservar(estimated_tokens)
+
+    def acquire_sync(self, estimated_tokens: int = 0):
+        """Versión bloqueante de acquire, para las llamadas síncronas a la API."""
+        espera = self._reservar(estimated_tokens)
+        while espera > 0:
+            time.sleep(espera)
+            espera = self._reservar(estimated_tokens)
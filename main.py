@@ -1,3 +1,7 @@
+from __future__ import annotations
+import asyncio
+from typing import List, Tuple
+
 from dotenv import load_dotenv
 
 from Servicios.Grammar import Grammar
@@ -9,10 +13,14 @@ from Modelos.Reporte import Reporte
 from Modelos.Parser import Parser
 from Modelos.Analizador import Analizador
 
+# Las variables del .env se cargan una vez al importar el módulo, sin pisar las ya
+# definidas. Ningún módulo las lee al importarse: LLMService lo hace al construirse.
+load_dotenv(override=False)
+
 
-def ejecutar_analisis_completo():
+def inicializar_servicios() -> Tuple[LLMService, Parser, Analizador] | None:
+    """Crea los servicios del analizador; devuelve None si alguno falla."""
     print("--- [PASO 0] Inicializando servicios de EffiCode Analyzer ---")
-    load_dotenv()
     try:
         grammar = Grammar()
         llm_service = LLMService()
@@ -21,7 +29,15 @@ def ejecutar_analisis_completo():
         print("✅ Servicios inicializados correctamente.")
     except Exception as e:
         print(f"❌ Error fatal al inicializar los servicios: {e}")
+        return None
+    return llm_service, parser, analizador
+
+
+async def ejecutar_analisis_completo():
+    servicios = inicializar_servicios()
+    if servicios is None:
         return
+    llm_service, parser, analizador = servicios
 
     pseudocodigo = """
     INSERTION-SORT(A, n)
@@ -37,12 +53,16 @@ def ejecutar_analisis_completo():
     print(pseudocodigo)
 
     try:
+        algoritmo = Algoritmo(id=1, codigo_fuente=pseudocodigo, tipo_algoritmo=TipoAlgoritmo.ITERATIVO)
+        # La clasificación del patrón solo depende del pseudocódigo, así que se lanza
+        # ya y su llamada a la IA transcurre mientras se traduce y analiza el algoritmo.
+        tarea_patron = asyncio.create_task(llm_service.clasificar_patron_async(algoritmo))
+
         print("\n--- [PASO 2] Ejecutando el Parser (Validación y Traducción a AST)... ---")
-        ast_obj = parser.parsear(pseudocodigo)
+        ast_obj = await parser.parsear_async(pseudocodigo)
         print("✅ AST generado con éxito.")
 
-        # 4. Crear el objeto Algoritmo y asignarle el AST
-        algoritmo = Algoritmo(id=1, codigo_fuente=pseudocodigo, tipo_algoritmo=TipoAlgoritmo.ITERATIVO)
+        # 4. Asignar el AST al objeto Algoritmo
         algoritmo.addAST(ast_obj)
 
         # 5. ¡Ejecutar el análisis de eficiencia!
@@ -53,15 +73,55 @@ def ejecutar_analisis_completo():
         reporte = Reporte(id=1, algoritmo_analizado=algoritmo, resultado_complejidad=resultado_complejidad)
 
         print("\n--- [PASO 4] Solicitando validación del análisis a la IA... ---")
-        validacion_ia = llm_service.validar_analisis(resultado_complejidad, pseudocodigo)
+        validacion_ia, patron = await asyncio.gather(
+            llm_service.validar_analisis_async(resultado_complejidad, pseudocodigo),
+            tarea_patron
+        )
         reporte.validacion_llm = validacion_ia
-        imprimir_reporte(reporte)
+        imprimir_reporte(reporte, patron)
+
+    except (SyntaxError, ConnectionError, ValueError, RuntimeError) as e:
+        print(f"❌ ERROR en el proceso de análisis: {e}")
+
+
+def ejecutar_analisis_corpus(pseudocodigos: List[str]):
+    """
+    Analiza un conjunto de algoritmos (p. ej. para una corrección masiva). La
+    traducción y el análisis se hacen por lotes, y todas las validaciones y
+    clasificaciones se envían en un único trabajo del modo por lotes de Gemini,
+    más barato y sin límite por minuto, ya que aquí la latencia no importa.
+    """
+    servicios = inicializar_servicios()
+    if servicios is None:
+        return
+    llm_service, parser, analizador = servicios
+
+    try:
+        print(f"\n--- [PASO 1] Validando y traduciendo a AST {len(pseudocodigos)} pseudocódigos... ---")
+        algoritmos = []
+        for i, (pseudocodigo, ast_obj) in enumerate(zip(pseudocodigos, parser.parsear_lote(pseudocodigos)), start=1):
+            if ast_obj is None:
+                print(f"⚠️  El pseudocódigo {i} no es válido según la gramática; se omite.")
+                continue
+            algoritmo = Algoritmo(id=i, codigo_fuente=pseudocodigo, tipo_algoritmo=TipoAlgoritmo.ITERATIVO)
+            algoritmo.addAST(ast_obj)
+            algoritmos.append(algoritmo)
+
+        print("\n--- [PASO 2] Ejecutando análisis de eficiencia matemática... ---")
+        complejidades = analizador.analizar_lote(algoritmos)
+
+        print("\n--- [PASO 3] Enviando validaciones y clasificaciones en modo por lotes... ---")
+        respuestas = llm_service.validar_y_clasificar_en_lote(list(zip(complejidades, algoritmos)))
+        for algoritmo, complejidad, (validacion_ia, patron) in zip(algoritmos, complejidades, respuestas):
+            reporte = Reporte(id=algoritmo.id, algoritmo_analizado=algoritmo, resultado_complejidad=complejidad)
+            reporte.validacion_llm = validacion_ia
+            imprimir_reporte(reporte, patron)
 
     except (SyntaxError, ConnectionError, ValueError, RuntimeError) as e:
         print(f"❌ ERROR en el proceso de análisis: {e}")
 
 
-def imprimir_reporte(reporte: Reporte):
+def imprimir_reporte(reporte: Reporte, patron: str | None = None):
     """Función auxiliar para mostrar el reporte de forma clara."""
     print("\n" + "="*70)
     print("📊 REPORTE FINAL DE ANÁLISIS DE COMPLEJIDAD ALGORÍTMICA")
@@ -81,8 +141,13 @@ def imprimir_reporte(reporte: Reporte):
     print("\n🤖 VALIDACIÓN POR IA (Segunda Opinión Experta)")
     print("-" * 70)
     print(reporte.validacion_llm)
+    if patron is not None:
+        print("\n" + "-"*70)
+        print("🧩 PATRÓN DE DISEÑO IDENTIFICADO POR IA")
+        print("-" * 70)
+        print(patron)
     print("="*70)
 
 
 if __name__ == "__main__":
-    ejecutar_analisis_completo()
\ No newline at end of file
+    asyncio.run(ejecutar_analisis_completo())
\ No newline at end of file
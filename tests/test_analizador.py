@@ -0,0 +1,185 @@
+import unittest
+from unittest import mock
+
+from Enumerations.tipoAlgoritmo import TipoAlgoritmo
+from Modelos.Algoritmo import Algoritmo
+from Modelos.Analizador import Analizador
+from Servicios.Ast import AST
+
+_SUMA = (
+    "def suma(A, n):\n"
+    "    s = 0\n"
+    "    for i in range(n):\n"
+    "        s = s + A[i]\n"
+    "    return s\n"
+)
+
+_BUSQUEDA = (
+    "def buscar(A, n, x):\n"
+    "    i = 0\n"
+    "    while i < n:\n"
+    "        if A[i] == x:\n"
+    "            break\n"
+    "        i = i + 1\n"
+    "    return i\n"
+)
+
+
+_LINEAL_CON_RETURN = (
+    "def buscar(A, n, x):\n"
+    "    for i in range(n):\n"
+    "        if A[i] == x:\n"
+    "            return i\n"
+    "    return 0\n"
+)
+
+_LINEAL_CON_BREAK = (
+    "def primero_negativo(A, n):\n"
+    "    k = 0\n"
+    "    for i in range(n):\n"
+    "        if A[i] < 0:\n"
+    "            break\n"
+    "        k = k + 1\n"
+    "    return k\n"
+)
+
+_WHILE_SIN_BREAK = (
+    "def contar(n):\n"
+    "    i = 0\n"
+    "    while i < n:\n"
+    "        i = i + 1\n"
+    "    return i\n"
+)
+
+# El break del bucle interior solo abandona ese bucle: el exterior recorre n elementos.
+_BURBUJA_BREAK_INTERIOR = (
+    "def f(A, n):\n"
+    "    for i in range(n):\n"
+    "        for j in range(n):\n"
+    "            if A[j] > A[i]:\n"
+    "                break\n"
+    "            A[j] = A[i]\n"
+)
+
+# Burbuja con bandera: si una pasada no intercambia nada, termina.
+_BURBUJA_BREAK_EXTERIOR = (
+    "def burbuja(A, n):\n"
+    "    for i in range(n):\n"
+    "        cambio = 0\n"
+    "        for j in range(n):\n"
+    "            if A[j] > A[j + 1]:\n"
+    "                A[j] = A[j + 1]\n"
+    "                cambio = 1\n"
+    "        if cambio == 0:\n"
+    "            break\n"
+)
+
+_MATRIZ_CON_RETURN = (
+    "def buscar(M, n, x):\n"
+    "    for i in range(n):\n"
+    "        for j in range(n):\n"
+    "            if M[i][j] == x:\n"
+    "                return 1\n"
+    "    return 0\n"
+)
+
+_INSERTION_SORT = (
+    "def insertion_sort(A, n):\n"
+    "    for j in range(n):\n"
+    "        key = A[j]\n"
+    "        i = j - 1\n"
+    "        while i > 0 and A[i] > key:\n"
+    "            A[i + 1] = A[i]\n"
+    "            i = i - 1\n"
+    "        A[i + 1] = key\n"
+)
+
+_BUCLE_EN_IF = (
+    "def f(A, n):\n"
+    "    if n > 0:\n"
+    "        for i in range(n):\n"
+    "            A[i] = 0\n"
+)
+
+
+def _algoritmo(codigo: str) -> Algoritmo:
+    algoritmo = Algoritmo(id=1, codigo_fuente=codigo, tipo_algoritmo=list(TipoAlgoritmo)[0])
+    algoritmo.addAST(AST(codigo))
+    return algoritmo
+
+
+class TestRutasDeAnalisis(unittest.TestCase):
+    """La ruta estructural y la simbólica deben dar las mismas cotas para el mismo código."""
+
+    def _notaciones(self, complejidad):
+        return complejidad.notacion_o, complejidad.notacion_omega, complejidad.notacion_theta
+
+    def _comparar_rutas(self, codigo: str):
+        algoritmo = _algoritmo(codigo)
+        analizador = Analizador(id=1, parser=None, llm_service=None)
+        estructura = analizador._analizar_ast(algoritmo.arbol_sintactico)
+        rapida = self._notaciones(analizador._analizar_estructural(algoritmo, estructura))
+        simbolica = self._notaciones(analizador._analizar_simbolico(algoritmo))
+        self.assertEqual(rapida, simbolica)
+        return rapida
+
+    def test_rutas_coinciden(self):
+        casos = [
+            (_SUMA, ("O(n)", "Ω(n)", "Θ(n)")),
+            (_BUSQUEDA, ("O(n)", "Ω(1)", "No aplicable")),
+            (_LINEAL_CON_RETURN, ("O(n)", "Ω(1)", "No aplicable")),
+            (_LINEAL_CON_BREAK, ("O(n)", "Ω(1)", "No aplicable")),
+            (_WHILE_SIN_BREAK, ("O(n)", "Ω(1)", "No aplicable")),
+            (_BUCLE_EN_IF, ("O(n)", "Ω(1)", "No aplicable")),
+            (_BURBUJA_BREAK_INTERIOR, ("O(n**2)", "Ω(n)", "No aplicable")),
+            (_BURBUJA_BREAK_EXTERIOR, ("O(n**2)", "Ω(n)", "No aplicable")),
+            (_MATRIZ_CON_RETURN, ("O(n**2)", "Ω(1)", "No aplicable")),
+            (_INSERTION_SORT, ("O(n**2)", "Ω(n)", "No aplicable")),
+        ]
+        for codigo, esperado in casos:
+            with self.subTest(codigo=codigo.splitlines()[0]):
+                self.assertEqual(self._comparar_rutas(codigo), esperado)
+
+    def test_analizar_no_depende_de_la_ruta(self):
+        # Un for con return da Ω(1) tanto a profundidad 1 (ruta estructural)
+        # como a profundidad 2 (ruta simbólica).
+        analizador = Analizador(id=1, parser=None, llm_service=None)
+        self.assertEqual(analizador.analizar(_algoritmo(_LINEAL_CON_RETURN)).notacion_omega, "Ω(1)")
+        self.assertEqual(analizador.analizar(_algoritmo(_MATRIZ_CON_RETURN)).notacion_omega, "Ω(1)")
+
+    def test_notacion_con_formato_de_sympy(self):
+        self.assertEqual(Analizador._NOTACIONES[(3, 3)], ("O(n**3)", "Ω(n**3)", "Θ(n**3)"))
+
+
+class TestAnalizarLote(unittest.TestCase):
+
+    # Mezcla de algoritmos de la ruta estructural y de la simbólica.
+    _LOTE = [_SUMA, _INSERTION_SORT, _LINEAL_CON_RETURN, _MATRIZ_CON_RETURN]
+    _ESPERADO = [("O(n)", "Ω(n)"), ("O(n**2)", "Ω(n)"), ("O(n)", "Ω(1)"), ("O(n**2)", "Ω(1)")]
+
+    def _analizar(self, analizador):
+        complejidades = analizador.analizar_lote([_algoritmo(codigo) for codigo in self._LOTE])
+        return [(c.notacion_o, c.notacion_omega) for c in complejidades]
+
+    def test_no_modifica_el_estado_en_ninguna_rama(self):
+        # Con el umbral en 2 y dos CPU, los dos algoritmos simbólicos van al pool.
+        for umbral in (Analizador._MIN_LOTE_PARALELO, 2):
+            with self.subTest(umbral=umbral), \
+                    mock.patch.object(Analizador, "_MIN_LOTE_PARALELO", umbral), \
+                    mock.patch("Modelos.Analizador.os.cpu_count", return_value=2):
+                analizador = Analizador(id=1, parser=None, llm_service=None)
+                self.assertEqual(self._analizar(analizador), self._ESPERADO)
+                self.assertIsNone(analizador.complejidad)
+                self.assertEqual(analizador._ultimo_analisis, {})
+
+    def test_la_ruta_estructural_no_usa_el_pool(self):
+        with mock.patch.object(Analizador, "_MIN_LOTE_PARALELO", 1), \
+                mock.patch("Modelos.Analizador.os.cpu_count", return_value=2), \
+                mock.patch("Modelos.Analizador.ProcessPoolExecutor") as pool:
+            complejidades = Analizador(id=1, parser=None, llm_service=None).analizar_lote(
+                [_algoritmo(_SUMA), _algoritmo(_LINEAL_CON_RETURN)])
+        pool.assert_not_called()
+        self.assertEqual([c.notacion_o for c in complejidades], ["O(n)", "O(n)"])
+
+if __name__ == '__main__':
+    unittest.main()
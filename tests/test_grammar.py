@@ -0,0 +1,150 @@
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from lark import Lark, exceptions
+
+from Servicios.Grammar import Grammar
+
+# Programas y fragmentos que cubren cada construcción documentada en la gramática.
+_VALIDOS = [
+    # Ejemplo de main.py (Introduction to Algorithms, Capítulo 2).
+    """
+    INSERTION-SORT(A, n)
+        for j ← 2 to n do
+            key ← A[j]
+            i ← j - 1
+            while i > 0 and A[i] > key do
+                A[i+1] ← A[i]
+                i ← i - 1
+            A[i+1] ← key
+    """,
+    """
+    BUSQUEDA-LINEAL(A, n, x)
+        for i ← 1 to n do
+            if A[i] = x then
+                return i
+        return 0
+    """,
+    """
+    MAXIMO(A, n)
+        m ← A[1]
+        for i ← n downto 2 do   // recorrido descendente
+            if A[i] > m then
+                m ← A[i]
+            else
+                m ← m
+        return m
+    """,
+    "x ← (a + b) * c div 2 mod 3 - -1",
+    "x ← not a ≤ b or c ≥ d and e ≠ f",
+    "nodo.siguiente[i] ← lista.cabeza.valor",
+    "MERGE(A, p, q, r)",
+    "while not vacia(Q) do x ← f(Q.cabeza, 1)",
+]
+
+_INVALIDOS = [
+    "x ← ",
+    "for i ← 1 to n",
+    "if x then",
+    "x ← (1 + 2",
+    "x ← 1 ++",
+    "// solo un comentario",
+]
+
+# Palabras reservadas que Earley, con su lexer dinámico, acepta como
+# identificadores y el lexer contextual de LALR rechaza: las que abren una
+# sentencia, usadas como destino de una asignación, y 'not' como operando.
+_RECHAZADAS_SOLO_POR_LALR = [
+    "if ← 1",
+    "for ← 1",
+    "while ← 1",
+    "return ← 1",
+    "x ← not",
+    "f(not)",
+]
+
+# En el resto de posiciones el lexer contextual no espera la palabra reservada
+# y la lee como IDENTIFICADOR, igual que Earley.
+_PALABRAS_RESERVADAS_ACEPTADAS_POR_AMBOS = [
+    "return for",
+    "x ← for",
+    "x ← while",
+    "do ← 1",
+    "then ← 1",
+    "x ← to",
+    "f(then)",
+    "f(and)",
+    "x ← mod + 1",
+]
+
+
+class TestEquivalenciaEarleyLalr(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.lalr = Grammar.default()
+        cls.earley = Lark(Grammar._pseudocode_grammar, start='start', parser='earley')
+
+    def _earley(self, codigo):
+        try:
+            return self.earley.parse(codigo)
+        except exceptions.LarkError:
+            return None
+
+    def _lalr(self, codigo):
+        with redirect_stdout(StringIO()):
+            return self.lalr.parse_or_none(codigo)
+
+    def test_ejemplos_validos_aceptados_por_ambos(self):
+        for codigo in _VALIDOS:
+            with self.subTest(codigo=codigo):
+                self.assertIsNotNone(self._lalr(codigo))
+                self.assertIsNotNone(self._earley(codigo))
+
+    def test_sentencias_simples_mismo_arbol(self):
+        for codigo in _VALIDOS[3:]:
+            with self.subTest(codigo=codigo):
+                # Earley nombra los nodos con Token('RULE', ...); se compara la forma impresa.
+                self.assertEqual(self._lalr(codigo).pretty(), self._earley(codigo).pretty())
+
+    def test_sentencia_tras_un_bloque_va_al_bloque_mas_interno(self):
+        # La gramática no modela la indentación: una sentencia que sigue a un bloque
+        # anidado es ambigua. LALR la asigna siempre al bloque abierto más interno;
+        # Earley puede elegir otra derivación (ocurre con los dos primeros programas).
+        arbol = self._lalr("if a then x ← 1 y ← 2")
+        bloque_then = arbol.children[1]
+        self.assertEqual(len(arbol.children), 2)
+        self.assertEqual([hijo.data for hijo in bloque_then.children], ["asignacion", "asignacion"])
+
+    def test_ejemplos_invalidos_rechazados_por_ambos(self):
+        for codigo in _INVALIDOS:
+            with self.subTest(codigo=codigo):
+                self.assertIsNone(self._lalr(codigo))
+                self.assertIsNone(self._earley(codigo))
+
+    def test_lalr_rechaza_palabras_reservadas_que_abren_sentencia_y_not(self):
+        for codigo in _RECHAZADAS_SOLO_POR_LALR:
+            with self.subTest(codigo=codigo):
+                self.assertIsNotNone(self._earley(codigo))
+                self.assertIsNone(self._lalr(codigo))
+
+    def test_otras_palabras_reservadas_siguen_siendo_identificadores(self):
+        for codigo in _PALABRAS_RESERVADAS_ACEPTADAS_POR_AMBOS:
+            with self.subTest(codigo=codigo):
+                self.assertIsNotNone(self._lalr(codigo))
+                self.assertIsNotNone(self._earley(codigo))
+
+
+class TestReglas(unittest.TestCase):
+
+    def test_listar_reglas_devuelve_una_copia(self):
+        reglas = Grammar.default().listar_reglas()
+        reglas["asignacion"] = "modificada"
+        reglas.clear()
+        self.assertNotEqual(Grammar.default().obtener_regla("asignacion"), "modificada")
+        self.assertIn("asignacion", Grammar().listar_reglas())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+import json
+import os
+import tempfile
+import types
+import unittest
+from collections import OrderedDict
+from pathlib import Path
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from Servicios.LLMService import LLMService
+
+
+class TestHuellaLibro(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.libro = Path(directorio.name) / "libro.pdf"
+        self.libro.write_bytes(b"%PDF primera edicion")
+        parche = mock.patch.object(LLMService, "_RUTA_LIBRO", self.libro)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.servicio = object.__new__(LLMService)
+        self.servicio._modelo = "modelo"
+
+    def test_la_clave_cambia_con_el_contenido_del_libro(self):
+        self.servicio._huella = self.servicio._huella_libro()
+        antes = self.servicio._clave_prompt("prompt")
+
+        self.libro.write_bytes(b"%PDF segunda edicion")  # mismo nombre de archivo
+        os.utime(self.libro, ns=(0, self.libro.stat().st_mtime_ns + 1))
+        self.servicio._huella = self.servicio._huella_libro()
+
+        self.assertNotEqual(self.servicio._clave_prompt("prompt"), antes)
+
+    def test_la_huella_se_memoriza_mientras_el_archivo_no_cambia(self):
+        primera = self.servicio._huella_libro()
+        with mock.patch("hashlib.file_digest") as digest:
+            self.assertEqual(self.servicio._huella_libro(), primera)
+        digest.assert_not_called()
+
+
+class TestCacheLibro(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = Path(directorio.name)
+        self.cache = self.directorio / "cache_file.json"
+        parche = mock.patch.object(LLMService, "_CACHE_FILE", self.cache)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.servicio = object.__new__(LLMService)
+
+    def test_una_cache_con_otra_forma_equivale_a_no_tenerla(self):
+        contenidos = [
+            [],
+            "cadena",
+            {"upload_time": "2024-01-01T00:00:00"},
+            {"file_name": "files/libro", "upload_time": 5},
+            {"file_name": "files/libro", "upload_time": "ayer"},
+        ]
+        for contenido in contenidos:
+            with self.subTest(contenido=contenido):
+                self.cache.write_text(json.dumps(contenido))
+                self.assertIsNone(self.servicio._cargar_cache())
+
+        valida = {"file_name": "files/libro", "upload_time": "2024-01-01T00:00:00", "file_sha256": "h"}
+        self.cache.write_text(json.dumps(valida))
+        self.assertEqual(self.servicio._cargar_cache(), valida)
+
+    def test_un_fallo_al_escribir_no_deja_el_temporal(self):
+        archivo = types.SimpleNamespace(name="files/libro", display_name="libro")
+        with mock.patch("Servicios.LLMService.genai", mock.Mock(upload_file=mock.Mock(return_value=archivo))), \
+                mock.patch.object(LLMService, "_ARCHIVOS_CONTEXTO", {}), \
+                mock.patch("Servicios.LLMService.json.dump", side_effect=TypeError("no serializable")), \
+                redirect_stdout(StringIO()):
+            with self.assertRaises(TypeError):
+                self.servicio._subir_y_guardar_libro_en_cache("h")
+        self.assertEqual(list(self.directorio.iterdir()), [])
+
+
+class TestCacheTraducciones(unittest.TestCase):
+
+    def setUp(self):
+        self.servicio = object.__new__(LLMService)
+        self.servicio._modelo, self.servicio._modelo_rapido = "principal", "rapido"
+        self.servicio._modelo_rapido_genai = None
+        self.servicio._huella = "h"
+        self.servicio._libro_contexto_file = "libro"
+        self.servicio._tokens_libro = 300_000
+        self.servicio._cache_respuestas = OrderedDict()
+        self.servicio._cache_disco = mock.Mock(get=mock.Mock(return_value=None))
+        self.servicio._limitador = mock.Mock()
+        self.servicio._tokens_cacheados = 0
+        respuesta = types.SimpleNamespace(text="```python\nx = 1\n```", usage_metadata=None)
+        self.servicio._modelo_genai = mock.Mock(generate_content=mock.Mock(return_value=respuesta))
+        parche = mock.patch.object(LLMService, "_opciones_peticion", return_value={})
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_solo_se_guarda_la_traduccion_limpia(self):
+        self.assertEqual(self.servicio.traducir_pseudocodigo_a_python("x ← 1"), "x = 1")
+        self.servicio._cache_disco.put.assert_called_once_with(self.servicio._clave_traduccion("x ← 1"), "x = 1")
+        # La segunda traducción sale de la caché sin llamar a la API.
+        self.assertEqual(self.servicio.traducir_pseudocodigo_a_python("x ← 1"), "x = 1")
+        self.assertEqual(self.servicio._modelo_genai.generate_content.call_count, 1)
+
+    def test_la_cuota_tpm_incluye_el_libro(self):
+        self.servicio.traducir_pseudocodigo_a_python("x ← 1")
+        (tokens,), _ = self.servicio._limitador.acquire_sync.call_args
+        self.assertGreater(tokens, 300_000)
+
+    def test_los_tokens_del_libro_se_cuentan_una_vez_por_huella(self):
+        contar = self.servicio._modelo_genai.count_tokens
+        contar.return_value = types.SimpleNamespace(total_tokens=314_000)
+        with mock.patch.object(LLMService, "_TOKENS_LIBRO", {}):
+            self.assertEqual(self.servicio._contar_tokens_libro(), 314_000)
+            self.assertEqual(self.servicio._contar_tokens_libro(), 314_000)
+            self.assertEqual(contar.call_count, 1)
+
+            # Si la API falla se usa la estimación fija.
+            self.servicio._huella = "otra edicion"
+            contar.side_effect = RuntimeError
+            with mock.patch("Servicios.LLMService.exceptions", types.SimpleNamespace(GoogleAPIError=RuntimeError),
+                            create=True):
+                self.assertEqual(self.servicio._contar_tokens_libro(), LLMService._TOKENS_LIBRO_ESTIMADOS)
+
+    def test_la_clave_depende_de_la_plantilla_y_del_modelo(self):
+        clave = self.servicio._clave_traduccion("x ← 1")
+        with mock.patch("Servicios.LLMService._HUELLA_TRADUCCION", "otra plantilla"):
+            self.assertNotEqual(self.servicio._clave_traduccion("x ← 1"), clave)
+        self.servicio._modelo = "otro modelo"
+        self.assertNotEqual(self.servicio._clave_traduccion("x ← 1"), clave)
+
+
+class _ClienteLotesFalso:
+    """Imita el cliente de 'google-genai': cada trabajo responde con el texto que devuelve 'responder'."""
+
+    def __init__(self, responder, estado="JOB_STATE_SUCCEEDED"):
+        self.entradas, self.trabajos = {}, []
+        cliente = self
+
+        class Archivos:
+            def upload(self, file, config):
+                nombre = f"files/{len(cliente.entradas)}"
+                with open(file, encoding="utf-8") as f:
+                    cliente.entradas[nombre] = [json.loads(linea) for linea in f]
+                return types.SimpleNamespace(name=nombre)
+
+            def download(self, file):
+                return "\n".join(json.dumps({"key": r["key"], "response": {"candidates": [{"content": {
+                    "parts": [{"text": responder(r["request"]["contents"][0]["parts"][1]["text"])}]}}]}})
+                    for r in cliente.entradas[file]).encode()
+
+        class Lotes:
+            def create(self, model, src, config):
+                cliente.trabajos.append((model, src))
+                return types.SimpleNamespace(name=src)
+
+            def get(self, name):
+                return types.SimpleNamespace(name=name, state=types.SimpleNamespace(name=estado),
+                                             dest=types.SimpleNamespace(file_name=name))
+
+        self.files, self.batches = Archivos(), Lotes()
+
+
+class TestModoPorLotes(unittest.TestCase):
+
+    def setUp(self):
+        self.servicio = object.__new__(LLMService)
+        self.servicio._modelo, self.servicio._modelo_rapido = "principal", "rapido"
+        self.servicio._modelo_genai = self.servicio._modelo_rapido_genai = None
+        self.servicio._huella = "h"
+        self.servicio._libro_contexto_file = types.SimpleNamespace(uri="u", mime_type="application/pdf")
+        self.servicio._cache_respuestas = OrderedDict()
+        self.servicio._cache_disco = mock.Mock(get=mock.Mock(return_value=None))
+
+    def _con_cliente(self, cliente):
+        parche = mock.patch.object(LLMService, "_cliente_lotes", return_value=cliente)
+        parche.start()
+        self.addCleanup(parche.stop)
+        return cliente
+
+    def test_clasificacion_comparte_modelo_clave_y_formato_con_la_llamada_individual(self):
+        cliente = self._con_cliente(_ClienteLotesFalso(lambda prompt: "Divide y Vencerás\nPorque divide..."))
+        with redirect_stdout(StringIO()):
+            [patron] = self.servicio.ejecutar_prompts_en_lote(["clasifica esto"], "clasificacion")
+
+        self.assertEqual(patron, "Divide y Vencerás")
+        modelo, archivo = cliente.trabajos[0]
+        self.assertEqual(modelo, "rapido")
+        peticion = cliente.entradas[archivo][0]["request"]
+        self.assertEqual(peticion["generation_config"]["max_output_tokens"], LLMService._LIMITES_ROL["clasificacion"])
+        # La llamada individual del mismo rol encuentra la respuesta en caché.
+        self.assertEqual(self.servicio._ejecutar_prompt_con_contexto("clasifica esto", "clasificacion"), patron)
+
+    def test_validar_y_clasificar_usa_un_trabajo_por_modelo(self):
+        cliente = self._con_cliente(_ClienteLotesFalso(lambda prompt: "Correcto."))
+        complejidad = types.SimpleNamespace(notacion_o="O(n)", notacion_omega="Ω(n)", justificacion_matematica="j")
+        algoritmo = types.SimpleNamespace(codigo_fuente="x ← 1")
+        with redirect_stdout(StringIO()):
+            resultado = self.servicio.validar_y_clasificar_en_lote([(complejidad, algoritmo)])
+        self.assertEqual(resultado, [("Correcto.", "Correcto.")])
+        self.assertEqual([modelo for modelo, _ in cliente.trabajos], ["principal", "rapido"])
+
+    def test_poll_batch_tiene_plazo(self):
+        self._con_cliente(_ClienteLotesFalso(str, estado="JOB_STATE_RUNNING"))
+        with mock.patch.object(LLMService, "_INTERVALO_SONDEO_LOTE", 0.01):
+            with self.assertRaises(TimeoutError):
+                self.servicio.poll_batch("batches/1", timeout=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from Modelos.Parser import Parser
+
+
+class _TraductorFalso:
+    """Sustituye al LLMService: traduce cada pseudocódigo a una asignación de Python."""
+
+    def __init__(self):
+        self.lotes = []
+
+    def traducir_batch(self, pseudocodigos):
+        self.lotes.append(list(pseudocodigos))
+        return [f"x = {len(pseudo)}" for pseudo in pseudocodigos]
+
+
+class _TraductorAsincronoFalso:
+    """Sustituye al LLMService asíncrono y, como el SDK, queda ligado al primer bucle que lo usa."""
+
+    def __init__(self):
+        self.bucle = None
+
+    async def traducir_pseudocodigo_a_python_async(self, pseudocodigo):
+        bucle = asyncio.get_running_loop()
+        if self.bucle is None:
+            self.bucle = bucle
+        elif self.bucle is not bucle or bucle.is_closed():
+            raise RuntimeError("Event loop is closed")
+        await asyncio.sleep(0)
+        return f"x = {len(pseudocodigo)}"
+
+
+class TestParsearBatch(unittest.TestCase):
+
+    def test_dos_llamadas_seguidas(self):
+        parser = Parser(id=1, llm_service=_TraductorAsincronoFalso())
+        primero = parser.parsear_batch(["x ← 1", "y ← 22"])
+        segundo = parser.parsear_batch(["z ← 333"])
+        self.assertEqual([a.codigo for a in primero], ["x = 5", "x = 6"])
+        self.assertEqual([a.codigo for a in segundo], ["x = 7"])
+
+    def test_dentro_de_un_bucle_usa_la_version_asincrona(self):
+        parser = Parser(id=1, llm_service=_TraductorAsincronoFalso())
+
+        async def principal():
+            with self.assertRaises(RuntimeError):
+                parser.parsear_batch(["x ← 1"])
+            return await parser.parsear_batch_async(["x ← 1"])
+
+        self.assertEqual(len(asyncio.run(principal())), 1)
+
+
+class TestParsearLote(unittest.TestCase):
+
+    def test_resultado_alineado_con_la_entrada(self):
+        traductor = _TraductorFalso()
+        parser = Parser(id=1, llm_service=traductor)
+        entradas = ["x ← 1", "x ← (", "y ← 2", "if then"]
+
+        salida = StringIO()
+        with redirect_stdout(salida):
+            resultados = parser.parsear_lote(entradas)
+
+        self.assertEqual(len(resultados), len(entradas))
+        self.assertIsNotNone(resultados[0])
+        self.assertIsNone(resultados[1])
+        self.assertIsNotNone(resultados[2])
+        self.assertIsNone(resultados[3])
+        # Solo los válidos llegan al LLM, y cada error de sintaxis se informa una vez.
+        self.assertEqual(traductor.lotes, [["x ← 1", "y ← 2"]])
+        self.assertEqual(salida.getvalue().count("Error de sintaxis"), 2)
+
+    def test_sin_validos_no_llama_al_llm(self):
+        traductor = _TraductorFalso()
+        with redirect_stdout(StringIO()):
+            resultados = Parser(id=1, llm_service=traductor).parsear_lote(["x ← (", ""])
+        self.assertEqual(resultados, [None, None])
+        self.assertEqual(traductor.lotes, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
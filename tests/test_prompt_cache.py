@@ -0,0 +1,46 @@
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from Servicios.PromptCache import PromptCache
+
+
+class TestPromptCache(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.cache = PromptCache(Path(directorio.name) / "cache.sqlite3")
+        self.addCleanup(self.cache.close)
+
+    def test_reutiliza_una_sola_conexion(self):
+        with mock.patch("sqlite3.connect", wraps=sqlite3.connect) as connect:
+            self.cache.put("a", "uno")
+            self.assertEqual(self.cache.get("a"), "uno")
+            self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(connect.call_count, 1)
+
+    def test_uso_desde_varios_hilos(self):
+        def escribir(i):
+            self.cache.put(f"clave {i}", f"valor {i}")
+
+        hilos = [threading.Thread(target=escribir, args=(i,)) for i in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual([self.cache.get(f"clave {i}") for i in range(8)], [f"valor {i}" for i in range(8)])
+
+    def test_entradas_caducadas(self):
+        cache = PromptCache(self.cache.ruta, ttl=timedelta(seconds=-1))
+        self.addCleanup(cache.close)
+        cache.put("a", "uno")
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
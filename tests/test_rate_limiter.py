@@ -0,0 +1,50 @@
+import asyncio
+import time
+import unittest
+
+from Servicios.LLMService import LLMService
+from Servicios.RateLimiter import AsyncTokenBucket
+
+
+class TestAsyncTokenBucket(unittest.TestCase):
+
+    def test_prompts_pequenos_no_se_limitan(self):
+        limitador = AsyncTokenBucket(rpm=60, tpm=1_000_000)
+        prompts = [f"Pseudocódigo {i}: " + "x ← x + 1\n" * 200 for i in range(30)]
+
+        async def enviar_todos():
+            await asyncio.gather(*(limitador.acquire(LLMService._tokens_estimados(p)) for p in prompts))
+
+        inicio = time.monotonic()
+        asyncio.run(enviar_todos())
+        self.assertLess(time.monotonic() - inicio, 0.5)
+
+    def test_respeta_peticiones_por_minuto(self):
+        limitador = AsyncTokenBucket(rpm=600, tpm=10**9)  # 10 peticiones por segundo
+        inicio = time.monotonic()
+        for _ in range(602):  # 600 de ráfaga inicial + 2 que deben esperar
+            limitador.acquire_sync()
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.15)
+
+    def test_respeta_tokens_por_minuto(self):
+        limitador = AsyncTokenBucket(rpm=10**6, tpm=6000)  # 100 tokens por segundo
+        limitador.acquire_sync(6000)
+        inicio = time.monotonic()
+        limitador.acquire_sync(20)
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.15)
+
+
+class TestLimitadorCompartido(unittest.TestCase):
+
+    def tearDown(self):
+        LLMService._LIMITADORES.clear()
+
+    def test_un_limitador_por_api_key(self):
+        a = LLMService._obtener_limitador("clave-a", rpm=60, tpm=1_000_000)
+        self.assertIs(LLMService._obtener_limitador("clave-a", rpm=60, tpm=1_000_000), a)
+        self.assertIsNot(LLMService._obtener_limitador("clave-b", rpm=60, tpm=1_000_000), a)
+        self.assertEqual((a.rpm, a.tpm), (60, 1_000_000))
+
+
+if __name__ == '__main__':
+    unittest.main()